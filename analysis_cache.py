@@ -0,0 +1,209 @@
+# analysis_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from executor import get_io_pool, run_io
+
+logger = logging.getLogger(__name__)
+
+# Bump this when the extraction or NLP output changes so old entries are ignored.
+CACHE_VERSION = "v3"
+
+
+def hash_bytes(data: bytes) -> str:
+    """Returns the SHA-256 hex digest of raw bytes (used for uploaded resumes)."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(text: str) -> str:
+    """Returns the SHA-256 hex digest of a text (used for job descriptions)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Content-addressed cache for extracted resume text and NLP results.
+    An in-memory LRU tier with a TTL, optionally backed by a directory of JSON files. The directory
+    holds resume contents, so it is swept in the I/O pool every sweep_interval_seconds: expired
+    files are deleted, then the oldest entries beyond max_disk_entries. On the event loop use
+    get_async()/set_async(), which read and write the files in the I/O pool.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600, disk_dir: Optional[str] = None,
+                 max_disk_entries: int = 10000, sweep_interval_seconds: float = 60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self.disk_files_removed = 0
+        self._last_sweep = 0.0  # the first write sweeps what earlier runs left behind
+        self._sweeping = False
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{CACHE_VERSION}-{key.replace(':', '-')}.json")
+
+    def get_memory(self, key: str) -> Optional[Dict]:
+        """Returns a value from the memory tier only (never blocks); misses are not counted."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if time.time() - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return value
+                del self._entries[key]
+            return None
+
+    def get_disk(self, key: str) -> Optional[Dict]:
+        """Looks the key up on disk (blocking), counting a miss if it is not there either."""
+        value = self._get_disk(key, time.time())
+        with self._lock:
+            self.stats["disk_hits" if value is not None else "misses"] += 1
+        return value
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Returns the cached value for a key, or None if it is missing or expired."""
+        value = self.get_memory(key)
+        return value if value is not None else self.get_disk(key)
+
+    async def get_async(self, key: str) -> Optional[Dict]:
+        """get() with the disk lookup in the I/O pool."""
+        value = self.get_memory(key)
+        if value is not None:
+            return value
+        if not self.disk_dir:
+            return self.get_disk(key)  # only counts the miss
+        return await run_io(self.get_disk, key)
+
+    def _get_disk(self, key: str, now: float) -> Optional[Dict]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if now - entry["stored_at"] >= self.ttl_seconds:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        self._put_memory(key, entry["value"], entry["stored_at"])
+        return entry["value"]
+
+    def set(self, key: str, value: Dict):
+        """Stores a value in memory and, when configured, on disk."""
+        stored_at = time.time()
+        self._put_memory(key, value, stored_at)
+        if self.disk_dir:
+            self._store_disk(key, value, stored_at)
+
+    async def set_async(self, key: str, value: Dict):
+        """set() with the disk write in the I/O pool."""
+        stored_at = time.time()
+        self._put_memory(key, value, stored_at)
+        if self.disk_dir:
+            await run_io(self._store_disk, key, value, stored_at)
+
+    def _store_disk(self, key: str, value: Dict, stored_at: float):
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": stored_at, "value": value}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write analysis cache entry to disk: {e}")
+        self._schedule_sweep(stored_at)
+
+    def _schedule_sweep(self, now: float):
+        with self._lock:
+            if self._sweeping or now - self._last_sweep < self.sweep_interval_seconds:
+                return
+            self._sweeping = True
+            self._last_sweep = now
+        get_io_pool().submit(self.sweep_disk)
+
+    def sweep_disk(self) -> int:
+        """
+        Deletes entry and temp files older than the TTL (including other cache versions' files),
+        then the oldest current entries beyond max_disk_entries. Returns the number of files removed.
+        """
+        try:
+            if not self.disk_dir:
+                return 0
+            now = time.time()
+            current = []
+            doomed = []
+            with os.scandir(self.disk_dir) as listing:
+                for item in listing:
+                    if not item.name.endswith((".json", ".tmp")):
+                        continue
+                    try:
+                        modified = item.stat().st_mtime
+                    except OSError:
+                        continue
+                    if now - modified >= self.ttl_seconds:
+                        doomed.append(item.path)
+                    elif item.name.startswith(f"{CACHE_VERSION}-") and item.name.endswith(".json"):
+                        current.append((modified, item.path))
+            if len(current) > self.max_disk_entries:
+                current.sort()
+                doomed.extend(path for _, path in current[:len(current) - self.max_disk_entries])
+
+            removed = 0
+            for path in doomed:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+            with self._lock:
+                self.disk_files_removed += removed
+            return removed
+        except OSError as e:
+            logger.warning(f"Could not sweep the analysis cache directory: {e}")
+            return 0
+        finally:
+            with self._lock:
+                self._sweeping = False
+
+    def _put_memory(self, key: str, value: Dict, stored_at: float):
+        with self._lock:
+            self._entries[key] = (stored_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def snapshot(self) -> Dict:
+        """Returns hit/miss counters and the number of in-memory entries."""
+        with self._lock:
+            lookups = sum(self.stats.values())
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            return {
+                **self.stats,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._entries),
+                "disk_files_removed": self.disk_files_removed,
+            }
+
+    def clear(self):
+        """Drops all in-memory entries. Files on disk are left in place."""
+        with self._lock:
+            self._entries.clear()
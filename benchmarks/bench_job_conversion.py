@@ -0,0 +1,93 @@
+# benchmarks/bench_job_conversion.py
+#
+# Time and peak memory of converting a jobspy-shaped DataFrame to listings: the original
+# rename + to_dict('records') path against the column-selecting generator and the bulk outputs.
+# Run from the repository root: python benchmarks/bench_job_conversion.py [--rows 10000]
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from job_scraper import EXPECTED_COLUMNS, dataframe_to_arrow, dataframe_to_listings, iter_listings, write_ndjson
+
+# The columns jobspy returns besides the ones we keep.
+EXTRA_COLUMNS = [
+    "id", "job_url_direct", "date_posted", "job_type", "salary_source", "interval", "min_amount", "max_amount",
+    "currency", "is_remote", "job_level", "job_function", "listing_type", "emails", "company_industry",
+    "company_url", "company_logo", "company_url_direct", "company_addresses", "company_num_employees",
+    "company_revenue", "company_description", "skills", "experience_range", "company_rating",
+    "company_reviews_count", "vacancy_count", "work_from_home_type",
+]
+
+
+def make_frame(rows: int, description_words: int) -> pd.DataFrame:
+    rng = random.Random(42)
+    words = ["python", "docker", "team", "build", "services", "remote", "data", "platform", "sql", "cloud"]
+    data = {
+        "site": ["indeed"] * rows,
+        "title": [f"Engineer {i}" for i in range(rows)],
+        "company": [f"Company {i % 500}" if i % 37 else None for i in range(rows)],
+        "location": ["Remote"] * rows,
+        "job_url": [f"https://jobs.example.com/{i}" for i in range(rows)],
+        "description": [" ".join(rng.choices(words, k=description_words)) for _ in range(rows)],
+    }
+    for column in EXTRA_COLUMNS:
+        data[column] = [f"{column}-{i}" for i in range(rows)]
+    return pd.DataFrame(data)
+
+
+def legacy_to_listings(jobs: pd.DataFrame, site: str) -> list:
+    """The conversion scrape_indeed_jobs used before: rename, to_dict('records'), then a second dict per row."""
+    jobs_renamed = jobs.rename(columns={"job_url": "link"})
+    output_jobs = []
+    for job_dict in jobs_renamed.to_dict('records'):
+        output_dict = {col: job_dict.get(col, "N/A") for col in EXPECTED_COLUMNS}
+        output_dict["site"] = job_dict.get("site", site)
+        output_jobs.append(output_dict)
+    return output_jobs
+
+
+def measure(label: str, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<34} {elapsed_ms:9.1f} ms  peak {peak / 1e6:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DataFrame -> listing conversion.")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--description-words", type=int, default=300)
+    args = parser.parse_args()
+
+    jobs = make_frame(args.rows, args.description_words)
+    print(f"{args.rows} rows x {len(jobs.columns)} columns "
+          f"({jobs.memory_usage(deep=True).sum() / 1e6:.1f} MB in pandas)")
+
+    assert legacy_to_listings(jobs.fillna("N/A"), "indeed") == dataframe_to_listings(jobs, "indeed")
+
+    measure("rename + to_dict('records')", lambda: legacy_to_listings(jobs, "indeed"))
+    measure("dataframe_to_listings", lambda: dataframe_to_listings(jobs, "indeed"))
+    measure("iter_listings (streamed, count)", lambda: sum(1 for _ in iter_listings(jobs, "indeed")))
+    with open(os.devnull, "w", encoding="utf-8") as sink:
+        measure("write_ndjson (with descriptions)", lambda: write_ndjson(iter_listings(jobs, "indeed", True), sink))
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("dataframe_to_arrow: skipped (pyarrow not installed)")
+    else:
+        measure("dataframe_to_arrow (with descriptions)", lambda: dataframe_to_arrow(jobs, "indeed", True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_pdf_extraction.py
+#
+# Compares the original sequential `text +=` PDF extraction with the page-parallel engine
+# in resume_extraction over generated PDFs of increasing size.
+# Run from the repository root: python benchmarks/bench_pdf_extraction.py [--pages 1 5 50 200]
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdfplumber
+
+import resume_extraction
+from executor import shutdown_executors
+from corpus import make_pdf
+
+
+def original_extract(file_content: bytes) -> str:
+    """The extraction loop previously in main.extract_text_from_resume."""
+    text = ""
+    with pdfplumber.open(io.BytesIO(file_content)) as pdf:
+        for page in pdf.pages:
+            text += (page.extract_text() or "") + "\n"
+    return text
+
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+async def run(args):
+    print(f"{'pages':>6} {'KB':>7} {'original ms':>12} {'engine ms':>10} {'unlimited ms':>13} {'chars kept':>11}")
+    for pages in args.pages:
+        content = make_pdf(pages)
+        original_ms, original_text = timed(lambda: original_extract(content), args.repeat)
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            text = await resume_extraction.extract_pdf_text(content)
+        engine_ms = (time.perf_counter() - start) / args.repeat * 1000
+
+        # Same engine without the character limit, to isolate the parallel speedup.
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            unlimited = await resume_extraction.extract_pdf_text(content, max_pages=10 ** 6, max_chars=10 ** 9)
+        unlimited_ms = (time.perf_counter() - start) / args.repeat * 1000
+        assert unlimited == original_text, "parallel extraction changed the text"
+
+        print(f"{pages:>6} {len(content) / 1024:>7.0f} {original_ms:>12.1f} {engine_ms:>10.1f} {unlimited_ms:>13.1f} {len(text):>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF text extraction.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 50, 200])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args))
+    finally:
+        shutdown_executors()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/bench_skill_matcher.py
+#
+# Compares the compiled SkillMatcher with the original per-skill substring scan.
+# Run from the repository root: python benchmarks/bench_skill_matcher.py [--skills 20000]
+
+import argparse
+import os
+import random
+import re
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from skill_catalog import SKILLS_LIST, SKILL_ALIASES
+from skill_matcher import SkillMatcher, WORD_CHARS
+
+BASE_SKILLS = [
+    "python", "java", "c++", "c", "c#", "javascript", "typescript", "html", "css",
+    "react", "node.js", "sql", "mysql", "postgresql", "docker", "kubernetes",
+    "machine learning", "deep learning", "scikit-learn", "project management",
+]
+FILLER_WORDS = ["built", "designed", "led", "team", "services", "using", "with", "and", "scalable", "data", "platform"]
+# Text -> skills the app's catalog must find in it: version suffixes match, dotted suffixes do not.
+CATALOG_CASES = {
+    "Python3, HTML5/CSS3 and Java8": {"python", "html", "css", "java"},
+    "vue3 and React18 front ends, c++17": {"vue.js", "react", "c++"},
+    "node.js, vue.js and next.js": {"node.js", "vue.js", "next.js"},
+    "Plain JS and TypeScript": {"javascript", "typescript"},
+    "python3a, java8x, html5.5": {"html"},
+}
+
+
+def naive_find(text: str, skills: list) -> set:
+    """The original implementation from analyze_text_with_nlp."""
+    return {skill for skill in skills if skill in text.lower()}
+
+
+def regex_find(text: str, skills: list) -> set:
+    """Reference boundary-aware matcher, used only to check SkillMatcher's output."""
+    text = " ".join(text.lower().split())
+    word = re.escape("".join(sorted(WORD_CHARS)))
+    found = set()
+    for skill in skills:
+        left = f"(?<![{word}.])" if skill[0] in WORD_CHARS else ""
+        right = f"(?=\\d*(?![{word}]))" if skill[-1] in WORD_CHARS else ""
+        if re.search(left + re.escape(skill) + right, text):
+            found.add(skill)
+    return found
+
+
+def make_taxonomy(size: int, rng: random.Random) -> list:
+    skills = list(BASE_SKILLS)
+    while len(skills) < size:
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(rng.randint(1, 3))]
+        skills.append(" ".join(words))
+    return skills
+
+
+def make_document(skills: list, words: int, rng: random.Random) -> str:
+    tokens = []
+    for _ in range(words):
+        if rng.random() < 0.05:
+            # Some mentions carry a version number or follow a '.', as in "python3" or "node.js".
+            token = rng.choice(skills) + rng.choice(["", "", "3", "17"]) + rng.choice(["", "", "x"])
+            tokens.append(rng.choice(["", "", "file."]) + token)
+        else:
+            tokens.append(rng.choice(FILLER_WORDS))
+    return " ".join(tokens)
+
+
+def time_call(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark skill matching.")
+    parser.add_argument("--skills", type=int, default=20000, help="Taxonomy size.")
+    parser.add_argument("--words", type=int, default=800, help="Words per synthetic resume.")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    skills = make_taxonomy(args.skills, rng)
+    document = make_document(skills, args.words, rng)
+
+    start = time.perf_counter()
+    matcher = SkillMatcher(skills)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    assert matcher.find(document) == regex_find(document, skills), "SkillMatcher disagrees with the reference matcher"
+    catalog = SkillMatcher(SKILLS_LIST, SKILL_ALIASES)
+    for text, expected in CATALOG_CASES.items():
+        assert catalog.find(text) == expected, f"{text!r}: found {sorted(catalog.find(text))}, expected {sorted(expected)}"
+
+    naive_ms = time_call(lambda: naive_find(document, skills), args.repeat)
+    matcher_ms = time_call(lambda: matcher.find(document), args.repeat)
+
+    print(f"taxonomy: {len(skills)} skills, document: {len(document)} chars")
+    print(f"compile:        {compile_ms:9.2f} ms (once)")
+    print(f"substring scan: {naive_ms:9.2f} ms/doc")
+    print(f"SkillMatcher:   {matcher_ms:9.2f} ms/doc ({naive_ms / matcher_ms:.1f}x)")
+
+    sample = "Senior JavaScript developer; no Java. Wrote C++ and MySQL."
+    print(f"false positives removed on {sample!r}: "
+          f"{sorted(naive_find(sample, BASE_SKILLS) - matcher.find(sample))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_spacy_pipeline.py
+#
+# Per-component timing and load-memory report for the full vs. slimmed spaCy pipeline.
+# Run from the repository root: python benchmarks/bench_spacy_pipeline.py [--docs 50]
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import spacy
+
+from nlp_pipeline import SPACY_MODEL, load_nlp, profile_pipeline
+
+SAMPLE_PARAGRAPH = (
+    "Jane Doe is a senior software engineer at Acme Corp in Bangalore. "
+    "She led a team of five building Python and FastAPI services on AWS, "
+    "migrated PostgreSQL workloads to Kubernetes and mentored interns from 2019 to 2023. "
+)
+
+
+def measure_load(loader):
+    tracemalloc.start()
+    start = time.perf_counter()
+    nlp = loader()
+    load_ms = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return nlp, load_ms, current / 1e6, peak / 1e6
+
+
+def report(label, nlp, load_ms, mem_mb, peak_mb, texts):
+    timings = profile_pipeline(nlp, texts)
+    total = sum(timings.values())
+    print(f"\n== {label}: {nlp.pipe_names}")
+    print(f"load: {load_ms:.0f} ms, retained {mem_mb:.1f} MB (peak {peak_mb:.1f} MB)")
+    for name, ms in timings.items():
+        print(f"  {name:<16} {ms / len(texts):8.2f} ms/doc  {ms / total * 100:5.1f}%")
+    print(f"  {'total':<16} {total / len(texts):8.2f} ms/doc")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark spaCy pipeline components.")
+    parser.add_argument("--docs", type=int, default=50)
+    parser.add_argument("--paragraphs", type=int, default=20, help="Paragraphs per synthetic resume.")
+    args = parser.parse_args()
+
+    texts = [SAMPLE_PARAGRAPH * args.paragraphs for _ in range(args.docs)]
+
+    full = measure_load(lambda: spacy.load(SPACY_MODEL))
+    full_total = report("full pipeline", full[0], *full[1:], texts)
+    del full
+
+    slim = measure_load(load_nlp)
+    slim_total = report("slim pipeline", slim[0], *slim[1:], texts)
+
+    print(f"\nslim pipeline is {full_total / slim_total:.1f}x faster per document;"
+          f" skills-only requests (NLP_MODE=auto) skip spaCy entirely.")
+
+
+if __name__ == "__main__":
+    main()
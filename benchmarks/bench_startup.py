@@ -0,0 +1,79 @@
+# benchmarks/bench_startup.py
+#
+# Measures app startup in fresh interpreters: `import main` (with the slowest direct imports),
+# the imports that are now deferred, model loading, and the warmup pass.
+# Run from the repository root: python benchmarks/bench_startup.py [--runs 3]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENV = {**os.environ, "GEMINI_BACKEND": "fake", "JOB_BACKEND": "fake", "JOB_INDEX_ENABLED": "0", "LLM_CACHE_DB": ""}
+
+# Imported by main.py at module level before lazy loading.
+# Measured in one interpreter, so a shared dependency is counted under the first module that imports it.
+DEFERRED_MODULES = ["spacy", "google.generativeai", "pandas", "jobspy", "pdfplumber", "docx", "scipy.sparse"]
+
+STAGES_SCRIPT = """
+import asyncio, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+main.load_models()
+loaded = time.perf_counter()
+asyncio.run(main.warmup())
+warmed = time.perf_counter()
+main.shutdown_executors()
+print(imported - start, loaded - imported, warmed - loaded)
+"""
+
+
+def import_profile(statement: str) -> list:
+    """Runs `python -X importtime` and returns (cumulative_us, depth, module) rows."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            cwd=ROOT, env=ENV, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), (len(name) - len(name.lstrip())) // 2, name.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark application startup.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    stages = []
+    for _ in range(args.runs):
+        result = subprocess.run([sys.executable, "-c", STAGES_SCRIPT], cwd=ROOT, env=ENV,
+                                capture_output=True, text=True, check=True)
+        stages.append([float(value) for value in result.stdout.split()[-3:]])
+    import_s, load_s, warmup_s = (statistics.median(column) for column in zip(*stages))
+    print(f"median of {args.runs} fresh interpreters:")
+    print(f"  import main:        {import_s * 1000:8.0f} ms")
+    print(f"  load models:        {load_s * 1000:8.0f} ms  (lifespan, before serving)")
+    print(f"  warmup pass:        {warmup_s * 1000:8.0f} ms  (background, until /ready)")
+
+    rows = import_profile("import main")
+    direct = sorted((row for row in rows if row[1] == 1), reverse=True)[:args.top]
+    print("slowest direct imports of main:")
+    for cumulative, _, name in direct:
+        print(f"  {name:<28} {cumulative / 1000:8.1f} ms")
+
+    deferred = import_profile("import " + ", ".join(DEFERRED_MODULES))
+    top_level = {name: cumulative for cumulative, depth, name in deferred if depth == 0}
+    print("deferred imports (no longer paid by `import main`):")
+    for name in DEFERRED_MODULES:
+        print(f"  {name:<28} {top_level.get(name, 0) / 1000:8.1f} ms")
+    print(f"  {'total':<28} {sum(top_level.values()) / 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/corpus.py
+#
+# Generates synthetic resume documents (PDF and DOCX) for the benchmarks, without extra dependencies.
+
+import io
+import random
+from typing import List
+
+import docx
+
+RESUME_LINES = [
+    "Jane Doe - Senior Software Engineer",
+    "Acme Corp, Bangalore (2019 - 2023)",
+    "Built Python and FastAPI services deployed with Docker on AWS",
+    "Migrated PostgreSQL workloads to Kubernetes and cut latency by 30%",
+    "Led a team of five engineers using Agile and Scrum",
+    "Developed React and TypeScript dashboards for internal analytics",
+    "Trained machine learning models with PyTorch and scikit-learn",
+    "Automated CI pipelines with GitHub Actions and Terraform",
+]
+
+
+def resume_lines(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [rng.choice(RESUME_LINES) for _ in range(count)]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: int, lines_per_page: int = 40, seed: int = 0) -> bytes:
+    """Builds a text-based PDF with the given number of pages."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        lines = resume_lines(lines_per_page, seed + page)
+        content = "BT /F1 10 Tf 40 760 Td 14 TL " + " ".join(f"({_escape(line)}) '" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {content_id} 0 R"
+            " /Resources << /Font << /F1 3 0 R >> >> >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF".encode())
+    return out.getvalue()
+
+
+def make_docx(paragraphs: int, seed: int = 0) -> bytes:
+    """Builds a DOCX with the given number of paragraphs."""
+    document = docx.Document()
+    for line in resume_lines(paragraphs, seed):
+        document.add_paragraph(line)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
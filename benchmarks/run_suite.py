@@ -0,0 +1,247 @@
+# benchmarks/run_suite.py
+#
+# End-to-end benchmark suite. Gemini and jobspy are replaced by the offline fakes (with
+# configurable latency), so results are deterministic and need no network. Covers resume
+# extraction (PDF/DOCX of several sizes), analyze_text_with_nlp, skill matching, and endpoint
+# latency/throughput through an in-process ASGI client, and reports p50/p95/p99 and RPS.
+#
+# Run from the repository root:
+#   python benchmarks/run_suite.py                                        # report only
+#   python benchmarks/run_suite.py --save-baseline benchmarks/baseline.json
+#   python benchmarks/run_suite.py --baseline benchmarks/baseline.json    # exits 1 on regressions
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import make_docx, make_pdf, resume_lines
+
+JOB_DESCRIPTION = (
+    "We are looking for a backend engineer with Python, FastAPI, SQL and Docker experience. "
+    "Kubernetes, AWS and machine learning are a plus. You will work in an Agile team."
+)
+# Metrics compared against the baseline; higher is worse for latencies, lower is worse for rps.
+COMPARED_LATENCIES = ("p50_ms", "p95_ms")
+
+
+# --- Statistics ---
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Linear-interpolated percentile (q in 0..100) of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(latencies: List[float], wall_seconds: float, errors: int = 0) -> Dict:
+    """Latency percentiles in ms plus throughput for one benchmark case."""
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "errors": errors,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+        "rps": round(len(values) / wall_seconds, 2) if wall_seconds else 0.0,
+    }
+
+
+async def measure(calls: List[Callable[[], Awaitable]], concurrency: int = 1) -> Dict:
+    """Runs the calls with at most `concurrency` in flight and summarizes their latencies."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def timed(call):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await call()
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed(call) for call in calls))
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+# --- Benchmark Cases ---
+
+async def stage_benchmarks(main, repeat: int) -> Dict[str, Dict]:
+    """The hot paths called directly, one at a time."""
+    from starlette.datastructures import UploadFile
+
+    async def in_thread(func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    results = {}
+    documents = {
+        "extract_pdf_1p": ("resume.pdf", make_pdf(1)),
+        "extract_pdf_5p": ("resume.pdf", make_pdf(5)),
+        "extract_pdf_20p": ("resume.pdf", make_pdf(20)),
+        "extract_docx_40para": ("resume.docx", make_docx(40)),
+        "extract_docx_400para": ("resume.docx", make_docx(400)),
+    }
+    for name, (filename, content) in documents.items():
+        results[name] = await measure([
+            lambda: main.extract_text_from_resume(UploadFile(file=io.BytesIO(content), filename=filename))
+            for _ in range(repeat)
+        ])
+
+    short_text = "\n".join(resume_lines(20))
+    long_text = "\n".join(resume_lines(400))
+    for name, text, with_entities in [
+        ("nlp_short_skills_only", short_text, False),
+        ("nlp_short_with_entities", short_text, True),
+        ("nlp_long_with_entities", long_text, True),
+    ]:
+        results[name] = await measure([
+            lambda: in_thread(main.analyze_text_with_nlp, text, with_entities) for _ in range(repeat)
+        ])
+
+    results["skill_match_long"] = await measure([
+        lambda: in_thread(main.skill_matcher.find, long_text) for _ in range(repeat * 5)
+    ])
+    return results
+
+
+async def endpoint_benchmarks(main, requests: int, concurrency: int) -> Dict[str, Dict]:
+    """
+    Endpoint latency/throughput through an in-process ASGI client. Every request, across all
+    cases, uses a different resume (and search), so the analysis, LLM and job-search caches do
+    not hide the work: a later case never finds the extraction or NLP of an earlier one cached.
+    """
+    import httpx
+
+    cases = {
+        "endpoint_analyze": ("/analyze/", lambda i: {"job_description": JOB_DESCRIPTION}),
+        "endpoint_cover_letter": ("/generate-cover-letter/", lambda i: {"job_description": JOB_DESCRIPTION}),
+        "endpoint_find_jobs": ("/find-jobs/", lambda i: {"search_query": f"python developer {i}"}),
+    }
+    transport = httpx.ASGITransport(app=main.app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+
+        def post(path: str, resume: bytes, data: Dict) -> Callable[[], Awaitable]:
+            async def call():
+                response = await client.post(path, files={"resume_file": ("resume.pdf", resume)}, data=data)
+                response.raise_for_status()
+            return call
+
+        for k, (name, (path, form)) in enumerate(cases.items()):
+            # Seeds step by the page count, so no resume shares a page with any other in the run.
+            resumes = [make_pdf(2, seed=2 * (k * requests + i)) for i in range(requests)]
+            results[name] = await measure([post(path, resumes[i], form(i)) for i in range(requests)], concurrency)
+    return results
+
+
+async def run_suite(args) -> Dict[str, Dict]:
+    import main
+
+    results = {}
+    async with main.lifespan(main.app):
+        while not main.readiness["ready"] and not main.readiness["error"]:
+            await asyncio.sleep(0.05)
+        if not args.skip_stages:
+            results.update(await stage_benchmarks(main, args.repeat))
+        if not args.skip_endpoints:
+            results.update(await endpoint_benchmarks(main, args.requests, args.concurrency))
+    return results
+
+
+# --- Reporting and Baselines ---
+
+def print_report(results: Dict[str, Dict]):
+    print(f"{'case':<26} {'n':>5} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mean ms':>9} {'rps':>9}")
+    for name, stats in results.items():
+        print(f"{name:<26} {stats['count']:>5} {stats['errors']:>4} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+              f"{stats['p99_ms']:>9.2f} {stats['mean_ms']:>9.2f} {stats['rps']:>9.2f}")
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Lists cases that got slower (latency up or rps down) by more than `tolerance` (0.2 = 20%)."""
+    regressions = []
+    print(f"\n{'case':<26} {'metric':<8} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        checks = [(metric, stats[metric], before[metric], 1) for metric in COMPARED_LATENCIES]
+        if name.startswith("endpoint_"):
+            checks.append(("rps", stats["rps"], before["rps"], -1))
+        for metric, current, previous, direction in checks:
+            if not previous:
+                continue
+            change = (current - previous) / previous
+            flag = ""
+            if change * direction > tolerance:
+                flag = "  REGRESSION"
+                regressions.append(f"{name} {metric}: {previous} -> {current} ({change:+.0%})")
+            print(f"{name:<26} {metric:<8} {previous:>10.2f} {current:>10.2f} {change:>+8.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark suite with offline fakes.")
+    parser.add_argument("--repeat", type=int, default=20, help="Calls per stage benchmark.")
+    parser.add_argument("--requests", type=int, default=60, help="Requests per endpoint.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent requests per endpoint.")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Fake Gemini latency (seconds).")
+    parser.add_argument("--job-latency", type=float, default=0.05, help="Fake job-site latency (seconds).")
+    parser.add_argument("--skip-stages", action="store_true")
+    parser.add_argument("--skip-endpoints", action="store_true")
+    parser.add_argument("--json", help="Write the results to this file.")
+    parser.add_argument("--save-baseline", help="Save the results as a baseline file.")
+    parser.add_argument("--baseline", help="Compare against this baseline; exit 1 on regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before a regression (0.2 = 20%%).")
+    args = parser.parse_args()
+
+    # The app reads its settings at import time, so the fakes are configured before importing it.
+    os.environ.update({
+        "GEMINI_BACKEND": "fake", "FAKE_LLM_LATENCY": str(args.llm_latency),
+        "JOB_BACKEND": "fake", "FAKE_JOB_LATENCY": str(args.job_latency),
+        "LLM_CACHE_DB": "", "ANALYSIS_CACHE_DIR": "", "JOB_INDEX_ENABLED": "0", "TASK_STORE": "memory",
+    })
+    results = asyncio.run(run_suite(args))
+    print_report(results)
+
+    environment = {
+        "python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count(),
+        "llm_latency": args.llm_latency, "job_latency": args.job_latency,
+        "requests": args.requests, "concurrency": args.concurrency,
+    }
+    for path in filter(None, (args.json, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment, "results": results}, f, indent=2)
+        print(f"\nWrote {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("environment") != environment:
+            print(f"\nNote: baseline was recorded with different settings: {saved.get('environment')}")
+        regressions = compare(results, saved["results"], args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+# bulk_ingest.py
+#
+# Offline bulk screening: extracts and analyzes every resume in a directory or archive and
+# writes one result per resume to JSONL or Parquet. Parsing runs in a process pool while the
+# main process batches the extracted texts through nlp.pipe, so the two stages overlap.
+# Progress is checkpointed after every flush; rerunning the same command resumes.
+#
+# Run: python bulk_ingest.py resumes/ --output results.jsonl [--job-description role.txt]
+#      python bulk_ingest.py resumes.zip --output results/ --format parquet --workers 8
+
+import argparse
+import json
+import logging
+import os
+import tarfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from nlp_pipeline import doc_entities, load_nlp
+from resume_extraction import MAX_UPLOAD_BYTES, extract_text_sync
+from skill_catalog import SKILL_ALIASES, SKILLS_LIST
+from skill_matcher import SkillMatcher
+
+logger = logging.getLogger("bulk_ingest")
+
+SUPPORTED_EXTENSIONS = ("pdf", "docx")
+STAGES = ("read", "extract", "nlp", "write")
+
+
+# --- Sources ---
+# Each source yields (key, extension, bytes or None, error); key identifies the file for checkpoints.
+
+def _extension(name: str) -> str:
+    return name.rsplit(".", 1)[-1].lower() if "." in name else ""
+
+
+def iter_directory(root: str) -> Iterator[Tuple[str, str, Optional[bytes], Optional[str]]]:
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        for name in sorted(files):
+            path = os.path.join(directory, name)
+            key = os.path.relpath(path, root)
+            extension = _extension(name)
+            if extension not in SUPPORTED_EXTENSIONS:
+                continue
+            if os.path.getsize(path) > MAX_UPLOAD_BYTES:
+                yield key, extension, None, f"file is larger than {MAX_UPLOAD_BYTES} bytes"
+                continue
+            with open(path, "rb") as f:
+                yield key, extension, f.read(), None
+
+
+def iter_zip(path: str) -> Iterator[Tuple[str, str, Optional[bytes], Optional[str]]]:
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            extension = _extension(info.filename)
+            if info.is_dir() or extension not in SUPPORTED_EXTENSIONS:
+                continue
+            if info.file_size > MAX_UPLOAD_BYTES:
+                yield info.filename, extension, None, f"file is larger than {MAX_UPLOAD_BYTES} bytes"
+                continue
+            yield info.filename, extension, archive.read(info), None
+
+
+def iter_tar(path: str) -> Iterator[Tuple[str, str, Optional[bytes], Optional[str]]]:
+    # Stream mode reads members in order without seeking, so compressed archives are read once.
+    with tarfile.open(path, mode="r|*") as archive:
+        for member in archive:
+            extension = _extension(member.name)
+            if not member.isfile() or extension not in SUPPORTED_EXTENSIONS:
+                continue
+            if member.size > MAX_UPLOAD_BYTES:
+                yield member.name, extension, None, f"file is larger than {MAX_UPLOAD_BYTES} bytes"
+                continue
+            yield member.name, extension, archive.extractfile(member).read(), None
+
+
+def iter_source(path: str) -> Iterator[Tuple[str, str, Optional[bytes], Optional[str]]]:
+    if os.path.isdir(path):
+        return iter_directory(path)
+    if zipfile.is_zipfile(path):
+        return iter_zip(path)
+    if tarfile.is_tarfile(path):
+        return iter_tar(path)
+    raise SystemExit(f"{path} is not a directory, zip or tar archive.")
+
+
+# --- Extraction (runs in the pool workers) ---
+
+def extract_one(key: str, extension: str, content: bytes) -> Tuple[str, Optional[str], Optional[str], float]:
+    """Returns (key, text, error, seconds)."""
+    start = time.perf_counter()
+    try:
+        text = extract_text_sync(content, extension)
+        error = None if text.strip() else "no text could be extracted"
+    except Exception as e:
+        text, error = None, f"{type(e).__name__}: {e}"
+    return key, text, error, time.perf_counter() - start
+
+
+# --- Output ---
+
+class Checkpoint:
+    """Keys already written, one per line; appended only after their results are flushed."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Set[str] = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.done = {line.rstrip("\n") for line in f if line.strip()}
+
+    def add(self, keys: List[str]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(f"{key}\n" for key in keys)
+            f.flush()
+            os.fsync(f.fileno())
+        self.done.update(keys)
+
+
+class JsonlWriter:
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, rows: List[Dict]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class ParquetWriter:
+    """One part file per flush in the output directory, so a crash never leaves a half-written file behind."""
+
+    def __init__(self, directory: str):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise SystemExit("Parquet output needs pyarrow: pip install pyarrow") from e
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._part = len([name for name in os.listdir(directory) if name.endswith(".parquet")])
+
+    def write(self, rows: List[Dict]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # A fixed schema keeps the part files consistent (a part with only nulls in a column would
+        # otherwise get a null type). Entities have different labels per row, so they are JSON text.
+        schema = pa.schema([
+            ("source", pa.string()), ("error", pa.string()), ("characters", pa.int64()),
+            ("skills", pa.list_(pa.string())), ("entities", pa.string()), ("matching_score_percent", pa.int64()),
+            ("matched_skills", pa.list_(pa.string())), ("missing_skills", pa.list_(pa.string())),
+        ])
+        table = pa.Table.from_pylist(
+            [{**row, "entities": json.dumps(row["entities"]) if row["entities"] is not None else None} for row in rows],
+            schema=schema
+        )
+        final_path = os.path.join(self.directory, f"part-{self._part:05d}.parquet")
+        pq.write_table(table, final_path + ".tmp")
+        os.replace(final_path + ".tmp", final_path)
+        self._part += 1
+
+
+# --- Pipeline ---
+
+class StageStats:
+    def __init__(self):
+        self.files = {stage: 0 for stage in STAGES}
+        self.seconds = {stage: 0.0 for stage in STAGES}
+        self.errors = 0
+        self.started = time.perf_counter()
+
+    def add(self, stage: str, files: int, seconds: float):
+        self.files[stage] += files
+        self.seconds[stage] += seconds
+
+    def report(self, workers: int) -> str:
+        """Files per busy second for each stage, and end-to-end files per wall-clock second."""
+        wall = time.perf_counter() - self.started
+        lines = [f"{'stage':<8} {'files':>7} {'busy s':>9} {'files/s':>9}"]
+        for stage in STAGES:
+            busy = self.seconds[stage]
+            lines.append(f"{stage:<8} {self.files[stage]:>7} {busy:>9.2f} {self.files[stage] / busy if busy else 0:>9.1f}")
+        written = self.files["write"]
+        lines.append(f"{'overall':<8} {written:>7} {wall:>9.2f} {written / wall if wall else 0:>9.1f}")
+        lines.append(f"({self.errors} errors; extract time is summed over {workers} workers, so its rate is per worker)")
+        return "\n".join(lines)
+
+
+class BulkIngestor:
+    def __init__(self, output: str, output_format: str, job_skills: Optional[Set[str]], with_entities: bool,
+                 workers: int, batch_size: int, flush_rows: int, nlp_processes: int):
+        self.writer = ParquetWriter(output) if output_format == "parquet" else JsonlWriter(output)
+        self.checkpoint = Checkpoint(os.path.join(output, "_checkpoint") if output_format == "parquet"
+                                     else f"{output}.checkpoint")
+        self.job_skills = job_skills
+        self.with_entities = with_entities
+        self.workers = workers
+        self.batch_size = batch_size
+        self.flush_rows = flush_rows
+        self.nlp_processes = nlp_processes
+        self.matcher = SkillMatcher(SKILLS_LIST, SKILL_ALIASES)
+        self.nlp = None
+        self.stats = StageStats()
+        self._texts: List[Tuple[str, str]] = []  # extracted, waiting for the NLP batch
+        self._rows: List[Dict] = []  # analyzed, waiting to be written
+
+    def run(self, source: Iterator[Tuple[str, str, Optional[bytes], Optional[str]]], progress_seconds: float = 10):
+        skipped = 0
+        next_progress = time.monotonic() + progress_seconds
+        # spaCy loads while this process has no other threads, so forking the workers after it is safe.
+        if self.with_entities:
+            self.nlp = load_nlp()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = set()
+            read_start = time.perf_counter()
+            for key, extension, content, error in source:
+                if key in self.checkpoint.done:
+                    skipped += 1
+                    continue
+                self.stats.add("read", 1, time.perf_counter() - read_start)
+                if error:
+                    self._add_row(key, None, error)
+                    self._maybe_flush()
+                else:
+                    pending.add(pool.submit(extract_one, key, extension, content))
+                # Bounded in-flight work keeps memory flat however large the input is.
+                while len(pending) >= self.workers * 4:
+                    pending = self._collect(pending, FIRST_COMPLETED)
+                if time.monotonic() >= next_progress:
+                    logger.info(f"Progress:\n{self.stats.report(self.workers)}")
+                    next_progress = time.monotonic() + progress_seconds
+                read_start = time.perf_counter()
+            while pending:
+                pending = self._collect(pending, FIRST_COMPLETED)
+        self._analyze_batch()
+        self._flush()
+        if skipped:
+            logger.info(f"Skipped {skipped} files already in the checkpoint.")
+        return self.stats
+
+    def _collect(self, pending, return_when):
+        done, pending = wait(pending, return_when=return_when)
+        for future in done:
+            key, text, error, seconds = future.result()
+            self.stats.add("extract", 1, seconds)
+            if error:
+                self._add_row(key, None, error)
+            else:
+                self._texts.append((key, text))
+        if len(self._texts) >= self.batch_size:
+            self._analyze_batch()
+        self._maybe_flush()
+        return pending
+
+    def _analyze_batch(self):
+        if not self._texts:
+            return
+        start = time.perf_counter()
+        texts = [text for _, text in self._texts]
+        if self.nlp is not None:
+            docs = self.nlp.pipe(texts, batch_size=self.batch_size, n_process=self.nlp_processes)
+        else:
+            docs = [None] * len(texts)
+        analyzed = [(key, text, doc_entities(doc) if doc is not None else None)
+                    for (key, text), doc in zip(self._texts, docs)]
+        for key, text, entities in analyzed:
+            self._add_row(key, text, None, entities, analyzed=True)
+        self.stats.add("nlp", len(analyzed), time.perf_counter() - start)
+        self._texts = []
+
+    def _add_row(self, key: str, text: Optional[str], error: Optional[str], entities: Optional[Dict] = None,
+                 analyzed: bool = False):
+        row = {"source": key, "error": error, "characters": len(text) if text else 0,
+               "skills": sorted(self.matcher.find(text)) if analyzed else [], "entities": entities}
+        if self.job_skills is not None and not error:
+            matched = self.job_skills.intersection(row["skills"])
+            row["matching_score_percent"] = round(len(matched) / len(self.job_skills) * 100) if self.job_skills else 0
+            row["matched_skills"] = sorted(matched)
+            row["missing_skills"] = sorted(self.job_skills - matched)
+        if error:
+            self.stats.errors += 1
+        self._rows.append(row)
+
+    def _maybe_flush(self):
+        if len(self._rows) >= self.flush_rows:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        start = time.perf_counter()
+        self.writer.write(self._rows)
+        self.checkpoint.add([row["source"] for row in self._rows])
+        self.stats.add("write", len(self._rows), time.perf_counter() - start)
+        self._rows = []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract and analyze a directory or archive of resumes.")
+    parser.add_argument("input", help="Directory, .zip or .tar(.gz) of PDF/DOCX resumes.")
+    parser.add_argument("--output", required=True, help="JSONL file, or a directory for --format parquet.")
+    parser.add_argument("--format", choices=("jsonl", "parquet"), default="jsonl")
+    parser.add_argument("--job-description", help="Text file with the role; adds a skill match score per resume.")
+    parser.add_argument("--no-entities", action="store_true", help="Skip NER (skills only; much faster).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Extraction processes.")
+    parser.add_argument("--batch-size", type=int, default=64, help="Texts per nlp.pipe batch.")
+    parser.add_argument("--nlp-processes", type=int, default=1, help="nlp.pipe n_process.")
+    parser.add_argument("--flush-rows", type=int, default=500, help="Rows per write and checkpoint.")
+    parser.add_argument("--restart", action="store_true", help="Ignore and replace previous output and checkpoint.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    if args.restart:
+        checkpoint = os.path.join(args.output, "_checkpoint") if args.format == "parquet" else f"{args.output}.checkpoint"
+        if args.format == "parquet" and os.path.isdir(args.output):
+            for name in os.listdir(args.output):
+                if name.endswith(".parquet"):
+                    os.remove(os.path.join(args.output, name))
+        elif os.path.exists(args.output):
+            os.remove(args.output)
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+    job_skills = None
+    if args.job_description:
+        with open(args.job_description, encoding="utf-8") as f:
+            job_skills = SkillMatcher(SKILLS_LIST, SKILL_ALIASES).find(f.read())
+        logger.info(f"Screening against {len(job_skills)} required skills: {', '.join(sorted(job_skills))}")
+
+    ingestor = BulkIngestor(args.output, args.format, job_skills, not args.no_entities,
+                            max(1, args.workers), max(1, args.batch_size), max(1, args.flush_rows), args.nlp_processes)
+    stats = ingestor.run(iter_source(args.input))
+    print(stats.report(ingestor.workers))
+
+
+if __name__ == "__main__":
+    main()
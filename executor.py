@@ -0,0 +1,90 @@
+# executor.py
+
+import asyncio
+import functools
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Executor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# --- Execution Limits ---
+# All limits can be overridden through environment variables.
+CPU_COUNT = os.cpu_count() or 1
+
+# Threads for blocking I/O (Gemini calls, jobspy scraping).
+IO_WORKERS = int(os.environ.get("IO_WORKERS", min(32, CPU_COUNT + 4)))
+# Processes for CPU-bound work (PDF/DOCX parsing, spaCy). 0 runs CPU work in the thread pool.
+CPU_WORKERS = int(os.environ.get("CPU_WORKERS", CPU_COUNT))
+# Requests handled at the same time; the rest wait for a free slot.
+MAX_CONCURRENT_REQUESTS = int(os.environ.get("MAX_CONCURRENT_REQUESTS", CPU_COUNT * 4))
+
+_io_pool: Optional[ThreadPoolExecutor] = None
+_cpu_pool: Optional[Executor] = None
+_request_slots: Optional[asyncio.Semaphore] = None
+
+
+def get_io_pool() -> ThreadPoolExecutor:
+    """Returns the shared thread pool, creating it on first use."""
+    global _io_pool
+    if _io_pool is None:
+        _io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="io-worker")
+        logger.info(f"Started I/O thread pool with {IO_WORKERS} workers.")
+    return _io_pool
+
+
+def get_cpu_pool() -> Executor:
+    """Returns the shared process pool, falling back to the thread pool when CPU_WORKERS is 0."""
+    global _cpu_pool
+    if _cpu_pool is None:
+        if CPU_WORKERS <= 0:
+            return get_io_pool()
+        _cpu_pool = ProcessPoolExecutor(max_workers=CPU_WORKERS)
+        logger.info(f"Started CPU process pool with {CPU_WORKERS} workers.")
+    return _cpu_pool
+
+
+async def run_io(func: Callable, *args, **kwargs) -> Any:
+    """Runs a blocking I/O-bound call in the thread pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_pool(), functools.partial(func, *args, **kwargs))
+
+
+async def run_cpu(func: Callable, *args, **kwargs) -> Any:
+    """Runs a CPU-bound call in the process pool. Arguments and result must be picklable."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_cpu_pool(), functools.partial(func, *args, **kwargs))
+
+
+async def start_cpu_pool():
+    """
+    Forks the CPU workers now. The first submit forks all of them, and a worker forked while
+    another thread holds a lock (an import, an lxml parse) inherits that lock held and hangs,
+    so call this at startup before other threads get busy.
+    """
+    if CPU_WORKERS > 0:
+        await run_cpu(os.getpid)
+
+
+@asynccontextmanager
+async def request_slot():
+    """Limits the number of requests doing work at the same time to MAX_CONCURRENT_REQUESTS."""
+    global _request_slots
+    if _request_slots is None:
+        _request_slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    async with _request_slots:
+        yield
+
+
+def shutdown_executors():
+    """Shuts down both pools. Called when the application stops."""
+    global _io_pool, _cpu_pool, _request_slots
+    if _cpu_pool is not None:
+        _cpu_pool.shutdown(wait=True, cancel_futures=True)
+        _cpu_pool = None
+    if _io_pool is not None:
+        _io_pool.shutdown(wait=True, cancel_futures=True)
+        _io_pool = None
+    _request_slots = None
@@ -0,0 +1,71 @@
+# fake_llm.py
+
+import asyncio
+import hashlib
+import random
+import time
+from typing import Iterator, List
+
+
+class FakeResponse:
+    """Mimics the parts of a Gemini response the app reads (.text)."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """
+    Offline stand-in for genai.GenerativeModel with the same generate_content() signature.
+    Output is deterministic for a given prompt; latency and quota errors can be simulated.
+    Enable it in the app with GEMINI_BACKEND=fake.
+    """
+
+    def __init__(self, model_name: str = "fake-gemini", latency_seconds: float = 0.0,
+                 chunk_delay_seconds: float = 0.0, words: int = 60, error_rate: float = 0.0, seed: int = 0):
+        self.model_name = model_name
+        self.latency_seconds = latency_seconds
+        self.chunk_delay_seconds = chunk_delay_seconds
+        self.words = words
+        self.error_rate = error_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    def _maybe_fail(self):
+        if self.error_rate and self._random.random() < self.error_rate:
+            from google.api_core.exceptions import ResourceExhausted
+            raise ResourceExhausted("Fake quota exceeded.")
+
+    def _words_for(self, prompt: str) -> List[str]:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        vocabulary = ["Led", "delivered", "optimized", "scalable", "services", "using", "team",
+                      "improving", "latency", "by", "30%", "and", "shipping", "features", "weekly."]
+        words = [f"[fake:{digest[:8]}]"]
+        for i in range(self.words - 1):
+            words.append(vocabulary[int(digest[i % len(digest)], 16) % len(vocabulary)])
+        return words
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs):
+        """Returns a FakeResponse, or an iterator of FakeResponse chunks when stream=True."""
+        self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        self._maybe_fail()
+        words = self._words_for(prompt)
+        if not stream:
+            return FakeResponse(" ".join(words))
+        return self._stream(words)
+
+    async def generate_content_async(self, prompt: str, **kwargs) -> FakeResponse:
+        """Async variant that sleeps on the event loop instead of blocking a thread."""
+        self.calls += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        self._maybe_fail()
+        return FakeResponse(" ".join(self._words_for(prompt)))
+
+    def _stream(self, words: List[str]) -> Iterator[FakeResponse]:
+        for i in range(0, len(words), 5):
+            if self.chunk_delay_seconds:
+                time.sleep(self.chunk_delay_seconds)
+            yield FakeResponse(" ".join(words[i:i + 5]) + " ")
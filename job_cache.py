@@ -0,0 +1,109 @@
+# job_cache.py
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def make_search_key(search_terms: Iterable[str], location: Optional[str], sites: Iterable[str], max_results: int) -> Tuple:
+    """Builds a cache key that ignores term order, case and surrounding whitespace."""
+    terms = tuple(sorted({" ".join(term.lower().split()) for term in search_terms if term.strip()}))
+    return terms, " ".join((location or "").lower().split()), tuple(sorted(sites)), max_results
+
+
+class JobSearchCache:
+    """
+    Job-search results with stale-while-revalidate semantics.
+    Fresh entries (younger than ttl_seconds) are served directly. Stale entries (up to
+    ttl_seconds + stale_seconds old) are served immediately while one background task per key
+    refreshes them; at most max_concurrent_refreshes background refreshes run at a time.
+    Concurrent misses for the same key share a single fetch.
+    """
+
+    def __init__(self, ttl_seconds: float = 900, stale_seconds: float = 3600,
+                 max_entries: int = 512, max_concurrent_refreshes: int = 4):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, tuple]" = OrderedDict()
+        self._pending: Dict[Tuple, asyncio.Future] = {}
+        self._refresh_slots = asyncio.Semaphore(max_concurrent_refreshes)
+        self._refreshing = set()
+        self._background = set()
+        self.stats = {"fresh_hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+
+    async def get_or_fetch(self, key: Tuple, fetch: Callable[[], Awaitable[Dict]]) -> Tuple[Dict, str]:
+        """Returns (result, cache_status) where cache_status is 'fresh', 'stale' or 'miss'."""
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None:
+            stored_at, value = entry
+            age = now - stored_at
+            if age < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.stats["fresh_hits"] += 1
+                return value, "fresh"
+            if age < self.ttl_seconds + self.stale_seconds:
+                self._entries.move_to_end(key)
+                self.stats["stale_hits"] += 1
+                self._schedule_refresh(key, fetch)
+                return value, "stale"
+            del self._entries[key]
+
+        self.stats["misses"] += 1
+        return await self._fetch_once(key, fetch), "miss"
+
+    async def _fetch_once(self, key: Tuple, fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+        """Runs fetch for a key unless the same fetch is already in progress, then stores the result."""
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch_and_store(key, fetch))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _fetch_and_store(self, key: Tuple, fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+        value = await fetch()
+        # Do not cache a result where every site failed; the next request should retry.
+        if value.get("jobs") or not value.get("sites_failed"):
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def _schedule_refresh(self, key: Tuple, fetch: Callable[[], Awaitable[Dict]]):
+        if key in self._pending or key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                async with self._refresh_slots:
+                    self.stats["refreshes"] += 1
+                    await self._fetch_once(key, fetch)
+            except Exception as e:
+                # Keep serving the stale entry; the next stale hit tries again.
+                self.stats["refresh_errors"] += 1
+                logger.warning(f"Background job-search refresh failed: {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.ensure_future(refresh())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def snapshot(self) -> Dict:
+        """Returns hit/miss counters and the number of cached searches."""
+        lookups = self.stats["fresh_hits"] + self.stats["stale_hits"] + self.stats["misses"]
+        hits = self.stats["fresh_hits"] + self.stats["stale_hits"]
+        return {
+            **self.stats,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "refreshing": len(self._refreshing),
+        }
@@ -0,0 +1,245 @@
+# job_index.py
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from executor import run_io
+from job_scraper import normalize_url, scrape_job_listings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    title TEXT, company TEXT, location TEXT, link TEXT, site TEXT, description TEXT,
+    search_location TEXT, skill_count INTEGER,
+    first_seen REAL, last_seen REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_last_seen ON jobs(last_seen);
+CREATE TABLE IF NOT EXISTS job_skills (
+    skill TEXT, job_id TEXT,
+    PRIMARY KEY (skill, job_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_job_skills_job ON job_skills(job_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(job_id UNINDEXED, title, company, description);
+"""
+
+
+def job_id_for(job: Dict) -> str:
+    """
+    Stable id for a posting: its normalized URL (which keeps the query parameters that identify a
+    posting, e.g. Indeed's jk), or a hash of title+company when there is none.
+    """
+    url = normalize_url(job.get("link"))
+    if url:
+        return url
+    key = f"{str(job.get('title', '')).lower()}|{str(job.get('company', '')).lower()}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def fts_query(terms: Iterable[str]) -> str:
+    """Builds an FTS5 OR-query with every term quoted, so user input cannot break the syntax."""
+    quoted = [f'"{term.replace(chr(34), "")}"' for term in terms if term.strip()]
+    return " OR ".join(quoted)
+
+
+class JobIndex:
+    """
+    Local store of job postings in SQLite: a skill -> job inverted index for skill-overlap
+    ranking plus an FTS5 table for free-text queries. Upserts are incremental and old
+    postings expire by last_seen.
+    """
+
+    def __init__(self, db_path: str = ":memory:"):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect()
+
+    def _connect(self):
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            if self.db_path != ":memory:":
+                self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+            self._drop_stale_ids()
+
+    def _drop_stale_ids(self):
+        """
+        Deletes postings whose id is not what job_id_for gives their link today. Ids used to drop
+        the whole query string, so each Indeed or Glassdoor posting had overwritten a single row.
+        """
+        self._db.create_function("normalize_url", 1, normalize_url, deterministic=True)
+        stale = [row[0] for row in self._db.execute(
+            "SELECT id FROM jobs WHERE normalize_url(link) != '' AND id != normalize_url(link)")]
+        if stale:
+            with self._db:
+                self._delete(stale)
+            logger.info(f"Dropped {len(stale)} job index entries keyed by an outdated URL form.")
+
+    def _delete(self, job_ids: List[str]):
+        for start in range(0, len(job_ids), 500):
+            batch = job_ids[start:start + 500]
+            marks = ",".join("?" * len(batch))
+            self._db.execute(f"DELETE FROM job_skills WHERE job_id IN ({marks})", batch)
+            self._db.execute(f"DELETE FROM jobs_fts WHERE job_id IN ({marks})", batch)
+            self._db.execute(f"DELETE FROM jobs WHERE id IN ({marks})", batch)
+
+    def reopen(self):
+        """Opens a fresh connection in a forked child (connections must not cross fork()). In-memory indexes are kept."""
+        if self.db_path != ":memory:":
+            self._connect()
+
+    def upsert(self, jobs: List[Dict], skill_extractor: Callable[[str], Iterable[str]], search_location: str = "") -> int:
+        """Inserts new postings and refreshes existing ones. Returns the number of postings written."""
+        now = time.time()
+        with self._lock, self._db:
+            for job in jobs:
+                job_id = job_id_for(job)
+                description = job.get("description") or ""
+                if description == "N/A":
+                    description = ""
+                skills = sorted(set(skill_extractor(f"{job.get('title', '')}\n{description}")))
+                self._db.execute(
+                    "INSERT INTO jobs (id, title, company, location, link, site, description, search_location,"
+                    " skill_count, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT(id) DO UPDATE SET title=excluded.title, company=excluded.company,"
+                    " location=excluded.location, site=excluded.site, description=excluded.description,"
+                    " search_location=excluded.search_location, skill_count=excluded.skill_count,"
+                    " last_seen=excluded.last_seen",
+                    (job_id, str(job.get("title", "")), str(job.get("company", "")), str(job.get("location", "")),
+                     str(job.get("link", "")), str(job.get("site", "")), description, search_location.lower(),
+                     len(skills), now, now)
+                )
+                self._db.execute("DELETE FROM job_skills WHERE job_id = ?", (job_id,))
+                self._db.executemany(
+                    "INSERT INTO job_skills (skill, job_id) VALUES (?, ?)", [(skill, job_id) for skill in skills]
+                )
+                self._db.execute("DELETE FROM jobs_fts WHERE job_id = ?", (job_id,))
+                self._db.execute(
+                    "INSERT INTO jobs_fts (job_id, title, company, description) VALUES (?, ?, ?, ?)",
+                    (job_id, str(job.get("title", "")), str(job.get("company", "")), description)
+                )
+        return len(jobs)
+
+    def expire(self, max_age_seconds: float) -> int:
+        """Deletes postings not seen for max_age_seconds. Returns the number removed."""
+        cutoff = time.time() - max_age_seconds
+        with self._lock, self._db:
+            expired = [row[0] for row in self._db.execute("SELECT id FROM jobs WHERE last_seen < ?", (cutoff,))]
+            self._delete(expired)
+        return len(expired)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def search(self, resume_skills: Iterable[str], query_terms: Optional[List[str]] = None,
+               location: Optional[str] = None, limit: int = 10) -> List[Dict]:
+        """
+        Ranks indexed postings by how many of the resume's skills they ask for (ties broken by
+        the share of the posting's skills covered, then recency). Free-text query terms filter
+        through FTS5; without resume skills the FTS relevance order is used instead.
+        """
+        skills = sorted(set(resume_skills))
+        params: List = []
+        filters = []
+        if query_terms:
+            filters.append("j.id IN (SELECT job_id FROM jobs_fts WHERE jobs_fts MATCH ?)")
+            params.append(fts_query(query_terms))
+        if location:
+            filters.append("(lower(j.location) LIKE ? OR j.search_location = ?)")
+            params.extend([f"%{location.lower()}%", location.lower()])
+        where = " AND ".join(filters) or "1"
+
+        with self._lock:
+            if skills:
+                marks = ",".join("?" * len(skills))
+                rows = self._db.execute(
+                    "SELECT j.title, j.company, j.location, j.link, j.site, j.skill_count,"
+                    " COUNT(s.skill) AS overlap, GROUP_CONCAT(s.skill) AS matched"
+                    f" FROM jobs j JOIN job_skills s ON s.job_id = j.id AND s.skill IN ({marks})"
+                    f" WHERE {where} GROUP BY j.id"
+                    " ORDER BY overlap DESC, CAST(overlap AS REAL) / j.skill_count DESC, j.last_seen DESC LIMIT ?",
+                    [*skills, *params, limit]
+                ).fetchall()
+            elif query_terms:
+                rows = self._db.execute(
+                    "SELECT j.title, j.company, j.location, j.link, j.site, j.skill_count, 0, ''"
+                    " FROM jobs_fts f JOIN jobs j ON j.id = f.job_id"
+                    f" WHERE jobs_fts MATCH ? AND {where} ORDER BY bm25(jobs_fts) LIMIT ?",
+                    [fts_query(query_terms), *params, limit]
+                ).fetchall()
+            else:
+                rows = []
+
+        results = []
+        for title, company, job_location, link, site, skill_count, overlap, matched in rows:
+            results.append({
+                "title": title, "company": company, "location": job_location, "link": link, "site": site,
+                "matched_skills": sorted(matched.split(",")) if matched else [],
+                "skill_overlap": overlap,
+                "job_skill_count": skill_count,
+            })
+        return results
+
+
+class JobIngestionWorker:
+    """Periodically scrapes configured queries/locations (with descriptions) into a JobIndex."""
+
+    def __init__(self, index: JobIndex, skill_extractor: Callable[[str], Iterable[str]], queries: List[str],
+                 locations: List[str], interval_seconds: float = 3600, max_results: int = 50,
+                 max_age_seconds: float = 7 * 24 * 3600):
+        self.index = index
+        self.skill_extractor = skill_extractor
+        self.queries = queries
+        self.locations = locations
+        self.interval_seconds = interval_seconds
+        self.max_results = max_results
+        self.max_age_seconds = max_age_seconds
+        self.last_run: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def ingest_once(self) -> int:
+        """Runs one ingestion pass and expires old postings. Returns the number of postings written."""
+        written = 0
+        for location in self.locations:
+            for query in self.queries:
+                result = await run_io(
+                    scrape_job_listings, [query], location, self.max_results,
+                    queries=[query], include_description=True
+                )
+                written += await run_io(self.index.upsert, result["jobs"], self.skill_extractor, location)
+        expired = await run_io(self.index.expire, self.max_age_seconds)
+        self.last_run = time.time()
+        logger.info(f"Job index ingestion: {written} postings upserted, {expired} expired.")
+        return written
+
+    async def _run_forever(self):
+        while True:
+            try:
+                await self.ingest_once()
+            except Exception as e:
+                logger.error(f"Job index ingestion failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
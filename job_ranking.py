@@ -0,0 +1,91 @@
+# job_ranking.py
+
+import re
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from skill_index import SkillIndex
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+STOP_WORDS = frozenset("""
+a an and are as at be by for from has have in is it of on or our the to we with you your will
+this that who what all can their they us not but if into about more than also other such
+""".split())
+
+# Weight of skill coverage vs. TF-IDF text similarity in the final relevance score.
+DEFAULT_SKILL_WEIGHT = 0.6
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stop words or single characters."""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if len(t) > 1 and t not in STOP_WORDS]
+
+
+def tfidf_matrix(documents: List[str]) -> Tuple[sparse.csr_matrix, Dict[str, int]]:
+    """
+    Builds an L2-normalized TF-IDF matrix (sublinear tf, smoothed idf) with one row per document.
+    Returns the matrix and the term -> column vocabulary.
+    """
+    vocabulary: Dict[str, int] = {}
+    lookup = vocabulary.setdefault
+    cols: List[int] = []
+    row_lengths = np.zeros(len(documents), dtype=np.int64)
+    for row, document in enumerate(documents):
+        start = len(cols)
+        cols.extend(lookup(token, len(vocabulary)) for token in tokenize(document))
+        row_lengths[row] = len(cols) - start
+
+    # One entry per token occurrence; converting to CSR sums duplicates into term counts.
+    rows = np.repeat(np.arange(len(documents)), row_lengths)
+    matrix = sparse.coo_matrix(
+        (np.ones(len(cols), dtype=np.float32), (rows, np.asarray(cols, dtype=np.int64))),
+        shape=(len(documents), max(len(vocabulary), 1))
+    ).tocsr()
+    matrix.data = 1.0 + np.log(matrix.data)
+    document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1.0
+    matrix = matrix @ sparse.diags(idf.astype(np.float32))
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix, vocabulary
+
+
+def rank_jobs(resume_text: str, resume_skills: Iterable[str], job_texts: List[str], job_skills: List[Iterable[str]],
+              index: SkillIndex, top_k: int = 10, skill_weight: float = DEFAULT_SKILL_WEIGHT) -> List[Dict]:
+    """
+    Scores every job against the resume in a few sparse-matrix operations:
+    skill coverage (share of a job's skills the resume has) blended with TF-IDF cosine similarity.
+    Returns the top_k jobs as dicts with 'job_index', 'relevance_score', 'matched_skills', 'missing_skills'.
+    """
+    if not job_texts:
+        return []
+
+    # Skill coverage: |job ∩ resume| / |job|, computed for all jobs with one sparse mat-vec product.
+    job_matrix = index.to_sparse(list(job_skills))
+    resume_vector = index.to_vector(resume_skills).astype(np.float32)
+    matched_counts = job_matrix @ resume_vector
+    required_counts = np.asarray(job_matrix.sum(axis=1)).ravel()
+    skill_scores = np.divide(matched_counts, required_counts, out=np.zeros_like(matched_counts), where=required_counts > 0)
+
+    # Text similarity: resume is the last row, so it shares the jobs' vocabulary and idf.
+    tfidf, _ = tfidf_matrix(job_texts + [resume_text])
+    text_scores = (tfidf[:-1] @ tfidf[-1].T).toarray().ravel()
+
+    scores = skill_weight * skill_scores + (1 - skill_weight) * text_scores
+    top_k = min(top_k, len(job_texts))
+    top = np.argpartition(-scores, top_k - 1)[:top_k]
+    top = top[np.argsort(-scores[top], kind="stable")]
+
+    resume_row = resume_vector.astype(bool)
+    results = []
+    for i in top:
+        job_row = job_matrix[i].toarray().ravel().astype(bool)
+        results.append({
+            "job_index": int(i),
+            "relevance_score": round(float(scores[i]) * 100, 1),
+            "matched_skills": index.decode(job_row & resume_row),
+            "missing_skills": index.decode(job_row & ~resume_row),
+        })
+    return results
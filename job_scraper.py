@@ -1,63 +1,344 @@
-from jobspy import scrape_jobs
-import pandas as pd
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, Callable, IO, Iterable, Iterator, List, Dict, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import hashlib
+import itertools
+import json
 import logging
+import os
+import random
+import time
+
+# pandas and jobspy are imported where they are used; they add about half a second to app startup.
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def scrape_indeed_jobs(search_keywords: List[str], location: Optional[str] = "remote", max_results: int = 10) -> List[Dict]:
+# --- Scraping Configuration ---
+# jobspy sites to query in parallel, e.g. "indeed,linkedin,glassdoor,zip_recruiter,google"
+JOB_SITES = [s.strip() for s in os.environ.get("JOB_SITES", "indeed,linkedin").split(",") if s.strip()]
+# Indeed/Glassdoor country, change if needed
+JOB_COUNTRY = os.environ.get("JOB_COUNTRY", "India")
+# Seconds to wait for each site, from when its scrape starts, before returning what the others found
+SITE_TIMEOUT = float(os.environ.get("JOB_SITE_TIMEOUT", 20))
+SCRAPE_WORKERS = int(os.environ.get("JOB_SCRAPE_WORKERS", 8))
+# Seconds a scrape may wait for a free scraper thread before it is dropped without running
+SCRAPE_QUEUE_TIMEOUT = float(os.environ.get("JOB_SCRAPE_QUEUE_TIMEOUT", SITE_TIMEOUT))
+
+EXPECTED_COLUMNS = ["title", "company", "location", "link"]
+# Our listing field -> jobspy column. Only these columns are read from scraped DataFrames.
+SOURCE_COLUMNS = {"title": "title", "company": "company", "location": "location", "link": "job_url"}
+MISSING_VALUE = "N/A"
+# Query parameters that only say where a click came from. The rest are kept: job boards identify
+# postings by query parameters (Indeed's viewjob?jk=..., Glassdoor's job-listing/j?jl=...).
+TRACKING_PARAMS = {"ref", "refid", "src", "source", "from", "trk", "trackingid", "tk", "fbclid", "gclid"}
+
+# Dedicated pool: scrapes are started from the app's I/O pool, so they must not queue behind it.
+_scrape_pool = ThreadPoolExecutor(max_workers=SCRAPE_WORKERS, thread_name_prefix="scraper")
+
+
+# --- Backends ---
+# A backend is a callable (site, search_term, location, results_wanted) -> DataFrame.
+
+def jobspy_backend(site: str, search_term: str, location: Optional[str], results_wanted: int) -> "pd.DataFrame":
+    """Scrapes one site with jobspy."""
+    from jobspy import scrape_jobs
+
+    return scrape_jobs(
+        site_name=[site],
+        search_term=search_term,
+        location=location,
+        results_wanted=results_wanted,
+        country_indeed=JOB_COUNTRY
+    )
+
+
+class FakeJobBackend:
+    """
+    Offline backend returning deterministic listings in jobspy's column layout.
+    Per-site latency and failures can be simulated, e.g. FakeJobBackend(fail_sites={"linkedin"}).
+    """
+
+    def __init__(self, latency_seconds: float = 0.0, fail_sites: Optional[set] = None,
+                 slow_sites: Optional[Dict[str, float]] = None, overlap: float = 0.3):
+        self.latency_seconds = latency_seconds
+        self.fail_sites = fail_sites or set()
+        self.slow_sites = slow_sites or {}
+        self.overlap = overlap
+        self.calls = 0
+
+    def __call__(self, site: str, search_term: str, location: Optional[str], results_wanted: int) -> "pd.DataFrame":
+        import pandas as pd
+
+        self.calls += 1
+        time.sleep(self.slow_sites.get(site, self.latency_seconds))
+        if site in self.fail_sites:
+            raise RuntimeError(f"Fake failure for {site}")
+
+        seed = hashlib.sha256(f"{search_term}|{location}".encode("utf-8")).hexdigest()
+        rng = random.Random(f"{seed}|{site}")
+        rows = []
+        for i in range(results_wanted):
+            # Some postings are shared across sites, as they are on real job boards.
+            shared = rng.random() < self.overlap
+            job_id = f"{seed[:6]}-{i}" if shared else f"{site}-{seed[:6]}-{i}"
+            rows.append({
+                "site": site,
+                "title": f"{search_term.split(' OR ')[0].title()} Engineer {job_id}",
+                "company": f"Company {job_id}",
+                "location": location or "remote",
+                # Indeed-style: the posting id is a query parameter, next to a tracking one.
+                "job_url": f"https://jobs.example.com/viewjob?jk={job_id}&ref={site}",
+                "description": f"We are hiring for {search_term}. Experience with python, docker and sql preferred.",
+            })
+        return pd.DataFrame(rows)
+
+
+def get_backend() -> Callable:
+    """Returns the configured backend (JOB_BACKEND=fake for offline runs)."""
+    if os.environ.get("JOB_BACKEND", "jobspy").lower() == "fake":
+        return FakeJobBackend(latency_seconds=float(os.environ.get("FAKE_JOB_LATENCY", 0)))
+    return jobspy_backend
+
+
+default_backend = get_backend()
+
+
+# --- Merging and Deduplication ---
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith("utm_")
+
+
+def normalize_url(url: str) -> str:
+    """
+    Lowercases scheme/host, drops the fragment, trailing slash and tracking parameters, and sorts
+    the remaining query parameters, which often identify the posting.
+    """
+    if not url or url == "N/A":
+        return ""
+    parts = urlsplit(str(url).strip())
+    params = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                    if not _is_tracking_param(name))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), urlencode(params), ""))
+
+
+def listing_keys(job: Dict) -> List[tuple]:
+    """Keys under which two listings count as the same posting."""
+    keys = []
+    url = normalize_url(job.get("link"))
+    if url:
+        keys.append(("url", url))
+    title = " ".join(str(job.get("title", "")).lower().split())
+    company = " ".join(str(job.get("company", "")).lower().split())
+    if title and company and "n/a" not in (title, company):
+        keys.append(("title_company", title, company))
+    return keys
+
+
+def merge_listings(listing_groups: List[List[Dict]], max_results: Optional[int] = None) -> List[Dict]:
+    """
+    Merges listings from several sites/queries, keeping the first of each duplicate. Within a site
+    a listing's URL identifies it: one employer may post the same title several times. Title and
+    company match a listing from another site, or one without a URL.
+    """
+    seen = {}  # key -> site of the listing that added it (None if it had no URL)
+    merged = []
+    for listings in listing_groups:
+        for job in listings:
+            keys = listing_keys(job)
+            site = job.get("site") if keys and keys[0][0] == "url" else None
+            if any(key in seen and (key[0] == "url" or site is None or seen[key] != site) for key in keys):
+                continue
+            for key in keys:
+                seen.setdefault(key, site)
+            merged.append(job)
+            if max_results and len(merged) >= max_results:
+                return merged
+    return merged
+
+
+def _column_values(jobs: "pd.DataFrame", column: str, default, rows: int) -> Iterable:
+    """Values of one column, or a constant when the scrape did not return it."""
+    if column in jobs.columns:
+        return jobs[column].to_numpy(dtype=object, na_value=default)
+    return itertools.repeat(default, rows)
+
+
+def iter_listings(jobs: Optional["pd.DataFrame"], site: str, include_description: bool = False) -> Iterator[Dict]:
     """
-    Scrapes job listings using the jobspy library.
-    This is much more robust than manual BeautifulSoup parsing.
+    Lazily yields listings from a jobspy DataFrame. Only the needed columns are touched,
+    and one small dict is built per row, on demand. Missing values become "N/A".
     """
-    
-    # 1. Prepare the search query
-    query_string = " OR ".join(search_keywords)
-    logger.info(f"Scraping with jobspy for: q='{query_string}', loc='{location}'")
+    if jobs is None or jobs.empty:
+        return
+    rows = len(jobs)
+    fields = list(SOURCE_COLUMNS) + ["site"]
+    columns = [_column_values(jobs, source, MISSING_VALUE, rows) for source in SOURCE_COLUMNS.values()]
+    columns.append(_column_values(jobs, "site", site, rows))
+    if include_description:
+        fields.append("description")
+        columns.append(_column_values(jobs, "description", "", rows))
+
+    for values in zip(*columns):
+        listing = dict(zip(fields, values))
+        if include_description and not isinstance(listing["description"], str):
+            listing["description"] = ""
+        yield listing
+
+
+def dataframe_to_listings(jobs: Optional["pd.DataFrame"], site: str, include_description: bool = False) -> List[Dict]:
+    """Converts a jobspy DataFrame to the list[dict] format our API expects (optionally with descriptions)."""
+    return list(iter_listings(jobs, site, include_description))
 
+
+def write_ndjson(listings: Iterable[Dict], fp: IO[str]) -> int:
+    """Streams listings to a text file as newline-delimited JSON. Returns the number of lines written."""
+    count = 0
+    for listing in listings:
+        fp.write(json.dumps(listing, ensure_ascii=False, default=str))
+        fp.write("\n")
+        count += 1
+    return count
+
+
+def dataframe_to_arrow(jobs: Optional["pd.DataFrame"], site: str, include_description: bool = False):
+    """
+    Converts a jobspy DataFrame to a pyarrow Table with the listing columns, without building
+    per-row dicts. For bulk consumers (Parquet, analytics); pyarrow is an optional dependency.
+    """
     try:
-        # 2. Scrape jobs
-        # jobspy pulls a lot of jobs, so we limit it. 
-        # results_wanted is per site, offset is the starting page.
-        jobs: pd.DataFrame = scrape_jobs(
-            site_name=["indeed"],  # We can add "linkedin", "ziprecruiter" later!
-            search_term=query_string,
-            location=location,
-            results_wanted=max_results,
-            country_indeed='India'  # Specify Indeed country, change if needed
-        )
-        
-        if jobs is None or jobs.empty:
-            logger.warning("jobspy returned no results (None or empty DataFrame).")
-            return []
-
-        # 3. Convert pandas DataFrame to the list[dict] format our API expects
-        
-        # Rename columns to match our existing API response
-        # jobspy columns are like 'title', 'company', 'location', 'job_url'
-        jobs_renamed = jobs.rename(columns={"job_url": "link"})
-        
-        # Handle potential missing columns gracefully
-        expected_columns = ["title", "company", "location", "link"]
-        output_jobs = []
-        
-        # to_dict('records') creates a list of dictionaries
-        for job_dict in jobs_renamed.to_dict('records'):
-            output_dict = {col: job_dict.get(col, "N/A") for col in expected_columns}
-            output_jobs.append(output_dict)
-
-        logger.info(f"Successfully scraped {len(output_jobs)} job listings.")
-        return output_jobs
-
-    except Exception as e:
-        logger.error(f"An error occurred during job scraping with jobspy: {e}")
-        return []
+        import pyarrow as pa
+    except ImportError as e:
+        raise RuntimeError("Arrow output needs pyarrow: pip install pyarrow") from e
+
+    fields = list(SOURCE_COLUMNS) + ["site"]
+    sources = list(SOURCE_COLUMNS.values()) + ["site"]
+    defaults = [MISSING_VALUE] * len(SOURCE_COLUMNS) + [site]
+    if include_description:
+        fields.append("description")
+        sources.append("description")
+        defaults.append("")
+
+    rows = 0 if jobs is None else len(jobs)
+    arrays = {}
+    for field, source, default in zip(fields, sources, defaults):
+        if rows and source in jobs.columns:
+            column = jobs[source]
+            arrays[field] = pa.array(column.where(column.notna(), default).astype(str), type=pa.string())
+        else:
+            arrays[field] = pa.array([default] * rows, type=pa.string())
+    return pa.table(arrays)
+
+
+def build_query_variants(search_keywords: List[str]) -> List[str]:
+    """The OR-query over all keywords, plus the plain phrase when there are several keywords."""
+    variants = [" OR ".join(search_keywords)]
+    if len(search_keywords) > 1:
+        variants.append(" ".join(search_keywords[:3]))
+    return variants
+
+
+# --- Scraping Engine ---
+
+def _run_scrape(started: Dict, key: tuple, backend: Callable, *args) -> "pd.DataFrame":
+    """Runs one scrape in the pool, recording when it started: a site's timeout counts from there."""
+    started[key] = time.monotonic()
+    return backend(*args)
+
+
+def _wait_for_scrapes(futures: Dict, started: Dict, site_timeout: float, queue_timeout: float) -> Dict:
+    """
+    Waits until every scrape has finished, has run for site_timeout, or has waited queue_timeout
+    for a thread (those are cancelled). Returns an error message per scrape that did not finish.
+    """
+    submitted = time.monotonic()
+    pending = set(futures)
+    unfinished = {}
+    while pending:
+        now = time.monotonic()
+        deadlines = []
+        for future in list(pending):
+            began = started.get(futures[future])
+            if began is None and now >= submitted + queue_timeout and future.cancel():
+                pending.discard(future)
+                unfinished[future] = f"not started within {queue_timeout:g}s (scraper threads busy)"
+            elif began is not None and now >= began + site_timeout:
+                pending.discard(future)
+                unfinished[future] = f"timed out after {site_timeout:g}s"
+            else:
+                # Not due yet, or due but just started (cancel() failed before started was set).
+                deadlines.append(began + site_timeout if began is not None
+                                 else max(submitted + queue_timeout, now + 0.01))
+        if pending:
+            done, _ = wait(pending, timeout=min(deadlines) - now, return_when=FIRST_COMPLETED)
+            pending -= done
+    return unfinished
+
+
+def scrape_job_listings(search_keywords: List[str], location: Optional[str] = "remote", max_results: int = 10,
+                        sites: Optional[List[str]] = None, queries: Optional[List[str]] = None,
+                        site_timeout: float = SITE_TIMEOUT, backend: Optional[Callable] = None,
+                        include_description: bool = False, queue_timeout: float = SCRAPE_QUEUE_TIMEOUT) -> Dict:
+    """
+    Scrapes every (site, query) pair concurrently and merges the de-duplicated results.
+    Sites that fail, run longer than site_timeout or wait longer than queue_timeout for a scraper
+    thread are reported, and the remaining results are still returned.
+    """
+    sites = sites or JOB_SITES
+    queries = queries or build_query_variants(search_keywords)
+    backend = backend or default_backend
+    logger.info(f"Scraping {sites} for queries {queries}, loc='{location}'")
+
+    futures = {}
+    started = {}
+    for query in queries:
+        for site in sites:
+            future = _scrape_pool.submit(_run_scrape, started, (site, query), backend, site, query, location, max_results)
+            futures[future] = (site, query)
+
+    unfinished = _wait_for_scrapes(futures, started, site_timeout, queue_timeout)
+
+    listing_groups = []
+    succeeded = set()
+    errors = {}
+    for future, (site, query) in futures.items():
+        if future in unfinished:
+            errors[site] = unfinished[future]
+            continue
+        try:
+            listing_groups.append(dataframe_to_listings(future.result(), site, include_description))
+            succeeded.add(site)
+        except Exception as e:
+            logger.error(f"Scraping {site} for '{query}' failed: {e}")
+            errors[site] = str(e)
+    # A site counts as failed only if none of its queries succeeded.
+    failed_sites = {site: error for site, error in errors.items() if site not in succeeded}
+
+    # Interleave sites so that max_results is not filled by whichever site finished first.
+    interleaved = []
+    for position in range(max((len(group) for group in listing_groups), default=0)):
+        interleaved.append([group[position] for group in listing_groups if position < len(group)])
+    jobs = merge_listings(interleaved, max_results)
+
+    logger.info(f"Scraped {len(jobs)} unique job listings from {sorted(succeeded)}; failed: {list(failed_sites)}")
+    return {"jobs": jobs, "sites_succeeded": sorted(succeeded), "sites_failed": failed_sites}
+
+
+def scrape_indeed_jobs(search_keywords: List[str], location: Optional[str] = "remote", max_results: int = 10) -> List[Dict]:
+    """
+    Scrapes job listings from Indeed using the jobspy library.
+    Kept for existing callers; scrape_job_listings covers multiple sites.
+    """
+    return scrape_job_listings(search_keywords, location, max_results, sites=["indeed"])["jobs"]
 
 # Example of how to test this file directly
 if __name__ == "__main__":
-    test_jobs = scrape_indeed_jobs(search_keywords=["python", "developer"], location="remote")
-    print(f"Found {len(test_jobs)} jobs:")
-    for job in test_jobs:
-        print(job)
\ No newline at end of file
+    result = scrape_job_listings(search_keywords=["python", "developer"], location="remote")
+    print(f"Found {len(result['jobs'])} jobs (failed sites: {result['sites_failed']}):")
+    for job in result["jobs"]:
+        print(job)
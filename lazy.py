@@ -0,0 +1,63 @@
+# lazy.py
+
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+_handles = weakref.WeakSet()
+
+
+class LazyHandle:
+    """
+    Builds an expensive object (a model, an API client) on first use instead of at import time.
+    Attribute access and calls are forwarded, so the handle can stand in for the object itself.
+    Loading is thread-safe and happens once per process; call get() to load ahead of time.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self._factory = factory
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.load_seconds: Optional[float] = None
+        _handles.add(self)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def get(self) -> Any:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    start = time.perf_counter()
+                    self._value = self._factory()
+                    self.load_seconds = time.perf_counter() - start
+                    self._loaded = True
+                    logger.info(f"Loaded {self.name} in {self.load_seconds:.2f}s (pid {os.getpid()})")
+        return self._value
+
+    def __getattr__(self, attr: str) -> Any:
+        # Only reached for attributes the handle itself does not have.
+        if attr.startswith("__") or attr in ("_factory", "_value", "_loaded", "_lock"):
+            raise AttributeError(attr)
+        return getattr(self.get(), attr)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self.get()(*args, **kwargs)
+
+
+def _reset_locks_after_fork():
+    # A worker forked while another thread was loading would inherit a held lock.
+    for handle in list(_handles):
+        handle._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_locks_after_fork)
@@ -0,0 +1,181 @@
+# llm_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from executor import run_io
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapses whitespace so indentation or trailing-space changes do not defeat the cache."""
+    return " ".join(prompt.split())
+
+
+def make_cache_key(model_name: str, prompt: str, generation_config: Optional[Dict] = None) -> str:
+    """Hashes the model name, normalized prompt and generation config into one cache key."""
+    payload = json.dumps(
+        {"model": model_name, "prompt": normalize_prompt(prompt), "config": generation_config or {}},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache for generated text: a bounded in-memory LRU in front of a SQLite table.
+    Entries expire after ttl_seconds; the SQLite tier is trimmed to max_db_entries by last access.
+    get/set block on SQLite; from the event loop use get_memory, get_async and set_async.
+    """
+
+    def __init__(self, max_memory_entries: int = 512, ttl_seconds: float = 86400,
+                 db_path: Optional[str] = None, max_db_entries: int = 10000):
+        self.max_memory_entries = max_memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.max_db_entries = max_db_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes_since_trim = 0
+        self.stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        if db_path:
+            self._open_db()
+
+    def _open_db(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            " key TEXT PRIMARY KEY, model TEXT, response TEXT,"
+            " created_at REAL, last_access REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_access ON llm_responses(last_access)")
+
+    def reopen(self):
+        """Opens a fresh SQLite connection; call in a forked child (connections must not cross fork())."""
+        if self.db_path:
+            self._lock = threading.Lock()
+            self._open_db()
+
+    def get_memory(self, key: str) -> Optional[str]:
+        """Returns a response from the memory tier only (never blocks); misses are not counted."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, response = entry
+                if time.time() - created_at < self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return response
+                del self._memory[key]
+            return None
+
+    def get_db(self, key: str) -> Optional[str]:
+        """Looks the key up in the SQLite tier (blocking), counting a miss if it is not there either."""
+        now = time.time()
+        with self._lock:
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    response, created_at = row
+                    if now - created_at < self.ttl_seconds:
+                        self._db.execute("UPDATE llm_responses SET last_access = ? WHERE key = ?", (now, key))
+                        self._put_memory(key, response, created_at)
+                        self.stats["db_hits"] += 1
+                        return response
+                    self._db.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                    self.stats["evictions"] += 1
+
+            self.stats["misses"] += 1
+            return None
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns a cached response, or None if it is missing or expired."""
+        response = self.get_memory(key)
+        return response if response is not None else self.get_db(key)
+
+    async def get_async(self, key: str) -> Optional[str]:
+        """get() with the SQLite lookup in the I/O pool."""
+        response = self.get_memory(key)
+        if response is not None:
+            return response
+        if self._db is None:
+            return self.get_db(key)  # only counts the miss
+        return await run_io(self.get_db, key)
+
+    def set(self, key: str, response: str, model_name: str = ""):
+        """Stores a response in both tiers."""
+        now = time.time()
+        with self._lock:
+            self._put_memory(key, response, now)
+            self.stats["stores"] += 1
+        self._store_db(key, response, model_name, now)
+
+    async def set_async(self, key: str, response: str, model_name: str = ""):
+        """set() with the SQLite write (and periodic trim) in the I/O pool."""
+        now = time.time()
+        with self._lock:
+            self._put_memory(key, response, now)
+            self.stats["stores"] += 1
+        if self._db is not None:
+            await run_io(self._store_db, key, response, model_name, now)
+
+    def _store_db(self, key: str, response: str, model_name: str, now: float):
+        with self._lock:
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, model, response, created_at, last_access)"
+                    " VALUES (?, ?, ?, ?, ?)", (key, model_name, response, now, now)
+                )
+                self._writes_since_trim += 1
+                if self._writes_since_trim >= 100:
+                    self._trim_db(now)
+
+    def _put_memory(self, key: str, response: str, created_at: float):
+        self._memory[key] = (created_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _trim_db(self, now: float):
+        """Deletes expired rows, then the least recently used rows above max_db_entries."""
+        self._writes_since_trim = 0
+        expired = self._db.execute(
+            "DELETE FROM llm_responses WHERE created_at <= ?", (now - self.ttl_seconds,)
+        ).rowcount
+        overflow = self._db.execute(
+            "DELETE FROM llm_responses WHERE key IN ("
+            " SELECT key FROM llm_responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_db_entries,)
+        ).rowcount
+        self.stats["evictions"] += expired + overflow
+
+    def snapshot(self) -> Dict:
+        """Returns hit/miss counters and tier sizes. Counts the SQLite rows, so call it off the event loop."""
+        with self._lock:
+            lookups = self.stats["memory_hits"] + self.stats["db_hits"] + self.stats["misses"]
+            hits = self.stats["memory_hits"] + self.stats["db_hits"]
+            db_entries = None
+            if self._db is not None:
+                db_entries = self._db.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+            return {
+                **self.stats,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "db_entries": db_entries,
+            }
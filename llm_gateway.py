@@ -0,0 +1,297 @@
+# llm_gateway.py
+
+import asyncio
+import logging
+import random
+import time
+from typing import AsyncIterator, Dict, Optional
+
+from executor import run_io
+from llm_cache import LLMResponseCache, make_cache_key
+
+try:
+    from google.api_core import exceptions as google_exceptions
+    RATE_LIMIT_ERRORS = (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)
+    TRANSIENT_ERRORS = (
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.InternalServerError,
+        google_exceptions.DeadlineExceeded,
+    )
+except ImportError:  # google-api-core is installed with google-generativeai, but keep the gateway usable without it
+    RATE_LIMIT_ERRORS = ()
+    TRANSIENT_ERRORS = ()
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    """A failed LLM call, carrying the HTTP status the API should answer with."""
+
+    def __init__(self, message: str, status_code: int = 502, retryable: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+
+
+class LLMTimeoutError(LLMError):
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message, status_code=504, retryable=retryable)
+
+
+class LLMRateLimitError(LLMError):
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message, status_code=429, retryable=retryable)
+
+
+class TokenBucket:
+    """Allows on average `rate` acquisitions per second, with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class GatewayMetrics:
+    """Counters and timings for outbound LLM calls."""
+
+    def __init__(self):
+        self.requests = 0
+        self.coalesced = 0
+        self.calls = 0
+        self.failed_calls = 0
+        self.retries = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.queue_wait_seconds = 0.0
+        self.max_queue_wait_seconds = 0.0
+        self.model_latency_seconds = 0.0
+        self.max_model_latency_seconds = 0.0
+
+    def record_call(self, queue_wait: float, latency: float, ok: bool = True):
+        self.calls += 1
+        if not ok:
+            self.failed_calls += 1
+        self.queue_wait_seconds += queue_wait
+        self.max_queue_wait_seconds = max(self.max_queue_wait_seconds, queue_wait)
+        self.model_latency_seconds += latency
+        self.max_model_latency_seconds = max(self.max_model_latency_seconds, latency)
+
+    def snapshot(self) -> Dict:
+        calls = max(self.calls, 1)
+        return {
+            "requests": self.requests,
+            "coalesced_requests": self.coalesced,
+            "upstream_calls": self.calls,
+            "failed_upstream_calls": self.failed_calls,
+            "retries": self.retries,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "rate_limited": self.rate_limited,
+            "in_flight": self.in_flight,
+            "avg_queue_wait_ms": round(self.queue_wait_seconds / calls * 1000, 2),
+            "max_queue_wait_ms": round(self.max_queue_wait_seconds * 1000, 2),
+            "avg_model_latency_ms": round(self.model_latency_seconds / calls * 1000, 2),
+            "max_model_latency_ms": round(self.max_model_latency_seconds * 1000, 2),
+        }
+
+
+class LLMGateway:
+    """
+    Async front door for a genai.GenerativeModel-compatible backend.
+    Limits concurrent and per-second calls, retries transient failures with jittered
+    exponential backoff inside an overall deadline, and coalesces identical in-flight prompts.
+    With a cache, previously generated responses are returned without calling the backend.
+    """
+
+    def __init__(self, backend, max_concurrency: int = 8, requests_per_second: Optional[float] = None,
+                 timeout_seconds: float = 60.0, deadline_seconds: float = 90.0, max_retries: int = 3,
+                 backoff_base_seconds: float = 0.5, backoff_max_seconds: float = 8.0,
+                 cache: Optional[LLMResponseCache] = None):
+        self.backend = backend
+        self.cache = cache
+        self.timeout_seconds = timeout_seconds
+        self.deadline_seconds = deadline_seconds
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.metrics = GatewayMetrics()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._bucket = TokenBucket(requests_per_second) if requests_per_second else None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def generation_config(self) -> Dict:
+        # Part of the cache key, so changing temperature etc. does not serve stale answers.
+        return getattr(self.backend, "_generation_config", None) or {}
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.backend, "model_name", type(self.backend).__name__)
+
+    async def generate(self, prompt: str, deadline_seconds: Optional[float] = None) -> str:
+        """Returns the generated text for a prompt, sharing the call with identical in-flight prompts."""
+        self.metrics.requests += 1
+        key = make_cache_key(self.model_name, prompt, self.generation_config)
+        if self.cache is not None:
+            cached = self.cache.get_memory(key)
+            if cached is not None:
+                return cached
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.metrics.coalesced += 1
+        else:
+            deadline = time.monotonic() + (deadline_seconds or self.deadline_seconds)
+            task = asyncio.ensure_future(self._generate_with_retries(prompt, key, deadline))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shield so that one disconnecting caller does not cancel the call for the others.
+        return await asyncio.shield(task)
+
+    async def _generate_with_retries(self, prompt: str, key: str, deadline: float) -> str:
+        # The SQLite tier is checked here, inside the coalesced call, off the event loop.
+        if self.cache is not None:
+            cached = await self.cache.get_async(key)
+            if cached is not None:
+                return cached
+        attempt = 0
+        while True:
+            try:
+                text = await self._call_once(prompt, deadline)
+                if self.cache is not None:
+                    await self.cache.set_async(key, text, self.model_name)
+                return text
+            except LLMError as e:
+                delay = random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt))
+                if not e.retryable or attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    self.metrics.errors += 1
+                    raise
+                attempt += 1
+                self.metrics.retries += 1
+                logger.warning(f"LLM call failed ({e}); retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def _acquire_slot(self, deadline: float) -> float:
+        """Waits for a concurrency slot (and rate-limit token). Returns the time spent waiting."""
+        queued_at = time.monotonic()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=max(0.0, deadline - queued_at))
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            raise LLMTimeoutError("Timed out waiting for an LLM slot.", retryable=False)
+        if self._bucket is not None:
+            # The slot is held from here on, so give it back if the token never comes.
+            try:
+                await asyncio.wait_for(self._bucket.acquire(), timeout=max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                self._semaphore.release()
+                self.metrics.timeouts += 1
+                raise LLMTimeoutError("Timed out waiting for the LLM rate limit.", retryable=False)
+            except BaseException:
+                self._semaphore.release()
+                raise
+        return time.monotonic() - queued_at
+
+    async def _call_once(self, prompt: str, deadline: float) -> str:
+        queue_wait = await self._acquire_slot(deadline)
+        self.metrics.in_flight += 1
+        started = time.monotonic()
+        ok = False
+        try:
+            timeout = min(self.timeout_seconds, max(0.0, deadline - started))
+            response = await asyncio.wait_for(self._invoke(prompt), timeout=timeout)
+            text = response.text.strip()
+            ok = True
+            return text
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            raise LLMTimeoutError("LLM call timed out.")
+        except RATE_LIMIT_ERRORS as e:
+            self.metrics.rate_limited += 1
+            raise LLMRateLimitError(f"LLM quota exceeded: {e}")
+        except TRANSIENT_ERRORS as e:
+            raise LLMError(f"LLM service unavailable: {e}", status_code=503, retryable=True)
+        except Exception as e:
+            raise LLMError(f"LLM call failed: {e}")
+        finally:
+            self.metrics.record_call(queue_wait, time.monotonic() - started, ok)
+            self.metrics.in_flight -= 1
+            self._semaphore.release()
+
+    async def _invoke(self, prompt: str):
+        if hasattr(self.backend, "generate_content_async"):
+            return await self.backend.generate_content_async(prompt)
+        return await run_io(self.backend.generate_content, prompt)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Yields generated text chunks as they arrive. Subject to the same concurrency and rate
+        limits as generate(); not retried or coalesced, since chunks may already have been sent.
+        A cached response is yielded as a single chunk; a completed stream is cached.
+        """
+        self.metrics.requests += 1
+        key = make_cache_key(self.model_name, prompt, self.generation_config)
+        if self.cache is not None:
+            cached = await self.cache.get_async(key)
+            if cached is not None:
+                yield cached
+                return
+
+        parts = []
+        async for text in self._stream_upstream(prompt):
+            parts.append(text)
+            yield text
+        if self.cache is not None:
+            await self.cache.set_async(key, "".join(parts).strip(), self.model_name)
+
+    async def _stream_upstream(self, prompt: str) -> AsyncIterator[str]:
+        deadline = time.monotonic() + self.deadline_seconds
+        queue_wait = await self._acquire_slot(deadline)
+        self.metrics.in_flight += 1
+        started = time.monotonic()
+        ok = False
+        try:
+            chunks = iter(await asyncio.wait_for(
+                run_io(self.backend.generate_content, prompt, stream=True), timeout=self.timeout_seconds
+            ))
+            while True:
+                chunk = await asyncio.wait_for(run_io(next, chunks, None), timeout=self.timeout_seconds)
+                if chunk is None:
+                    break
+                if chunk.text:
+                    yield chunk.text
+            ok = True
+        except (GeneratorExit, asyncio.CancelledError):
+            ok = True  # the client went away; not an upstream failure
+            raise
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            self.metrics.errors += 1
+            raise LLMTimeoutError("LLM stream timed out.", retryable=False)
+        except RATE_LIMIT_ERRORS as e:
+            self.metrics.rate_limited += 1
+            self.metrics.errors += 1
+            raise LLMRateLimitError(f"LLM quota exceeded: {e}", retryable=False)
+        except Exception as e:
+            self.metrics.errors += 1
+            raise LLMError(f"LLM call failed: {e}")
+        finally:
+            self.metrics.record_call(queue_wait, time.monotonic() - started, ok)
+            self.metrics.in_flight -= 1
+            self._semaphore.release()
@@ -1,39 +1,121 @@
 # main.py
 
-import io
 import os
-import docx
-import pdfplumber
-import spacy
-import google.generativeai as genai
+import asyncio
+import io
+import json
+import time
+from contextlib import asynccontextmanager, contextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from typing import Annotated, Optional
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, Response
+from typing import Annotated, Dict, List, Optional
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+# Load environment variables from a .env file (before the local modules below read their settings)
+load_dotenv()
 
 # Import the new scraping function
-from job_scraper import scrape_indeed_jobs 
+from job_scraper import scrape_job_listings, JOB_SITES
+from executor import run_io, run_cpu, request_slot, start_cpu_pool, shutdown_executors, CPU_WORKERS
+from analysis_cache import AnalysisCache, hash_text
+from skill_matcher import SkillMatcher
+from skill_catalog import SKILLS_LIST, SKILL_ALIASES
+from nlp_pipeline import load_nlp, entities_needed, doc_entities
+from skill_index import SkillIndex, score_skill_matches
+from fake_llm import FakeGenerativeModel
+from llm_gateway import LLMGateway, LLMError
+from llm_cache import LLMResponseCache
+from resume_extraction import extract_text, preload_parsers, MAX_UPLOAD_BYTES, MAX_CHARS
+from job_cache import JobSearchCache, make_search_key
+from job_index import JobIndex, JobIngestionWorker
+from lazy import LazyHandle
+from memory_stats import process_memory
+from task_queue import TaskQueue, InMemoryTaskStore, SQLiteTaskStore, QueueFullError, WebhookURLError
+from metrics import REGISTRY, timed_stage, start_request_timing, request_timings, server_timing_header
+from profiler import SamplingProfiler
+from prompt_builder import select_relevant_text
+from resume_sessions import ResumeSessionStore
+from uploads import SpooledUpload, RequestSizeLimitMiddleware, spool_upload
 
-# Load environment variables from a .env file
-load_dotenv()
 # --- Gemini API Configuration ---
 # Configure the client with your API key
-try:
-    api_key = os.environ.get("GOOGLE_API_KEY")
-    if not api_key:
-        raise ValueError("GOOGLE_API_KEY not found in environment variables.")
-    genai.configure(api_key=api_key)
+# GEMINI_BACKEND=fake swaps in an offline model with deterministic output (for tests and benchmarks).
+GEMINI_BACKEND = os.environ.get("GEMINI_BACKEND", "gemini").lower()
+
+
+def create_model():
+    """Creates the Gemini client (or the fake one). Called on first use or during warmup."""
+    if GEMINI_BACKEND == "fake":
+        return FakeGenerativeModel(
+            latency_seconds=float(os.environ.get("FAKE_LLM_LATENCY", 0)),
+            chunk_delay_seconds=float(os.environ.get("FAKE_LLM_CHUNK_DELAY", 0)),
+            error_rate=float(os.environ.get("FAKE_LLM_ERROR_RATE", 0))
+        )
+    # The google.generativeai import alone takes most of a second, so it is deferred until here.
+    import google.generativeai as genai
+
+    genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
     # Initialize the specific model
-    model = genai.GenerativeModel('gemini-2.5-flash')
-except Exception as e:
-    print(f"Fatal Error: Could not initialize Gemini client: {e}")
+    return genai.GenerativeModel('gemini-2.5-flash')
+
+
+if GEMINI_BACKEND == "fake" or os.environ.get("GOOGLE_API_KEY"):
+    model = LazyHandle("Gemini client", create_model)
+else:
+    print("Fatal Error: Could not initialize Gemini client: GOOGLE_API_KEY not found in environment variables.")
     model = None
 
+# Generated responses keyed on model + normalized prompt + generation config.
+llm_cache = LLMResponseCache(
+    max_memory_entries=int(os.environ.get("LLM_CACHE_SIZE", 512)),
+    ttl_seconds=float(os.environ.get("LLM_CACHE_TTL", 86400)),
+    db_path=os.environ.get("LLM_CACHE_DB", "llm_cache.sqlite3") or None,
+    max_db_entries=int(os.environ.get("LLM_CACHE_MAX_ROWS", 10000))
+)
+
+# All outbound Gemini calls go through the gateway: cache, concurrency/rate limits, retries, coalescing.
+llm_gateway = LLMGateway(
+    model,
+    max_concurrency=int(os.environ.get("LLM_MAX_CONCURRENCY", 8)),
+    requests_per_second=float(os.environ.get("LLM_RATE_LIMIT", 0)) or None,
+    timeout_seconds=float(os.environ.get("LLM_TIMEOUT", 60)),
+    deadline_seconds=float(os.environ.get("LLM_DEADLINE", 90)),
+    max_retries=int(os.environ.get("LLM_MAX_RETRIES", 3)),
+    cache=llm_cache
+) if model else None
+
 # --- FastAPI Application Setup ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Loads the models, starts the warmup and the job-index ingestion worker (if enabled), and
+    releases the worker pools on shutdown. Warmup runs in the background; /ready reports when it is done.
+    """
+    # Loaded before serving, and the CPU workers forked right after while no other thread is
+    # busy: a worker forked next to a thread that is mid-import or mid-parse can deadlock.
+    # The workers share the loaded pipeline.
+    await run_io(load_models)
+    await start_cpu_pool()
+    warmup_task = asyncio.ensure_future(warmup()) if WARMUP_ENABLED else None
+    if not WARMUP_ENABLED:
+        readiness["ready"] = True
+    if job_ingestion_worker and run_job_ingestion:
+        job_ingestion_worker.start()
+    task_queue.start()
+    yield
+    if warmup_task:
+        warmup_task.cancel()
+    await task_queue.stop()
+    if job_ingestion_worker:
+        await job_ingestion_worker.stop()
+    shutdown_executors()
+
 app = FastAPI(
     title="Resume Improvement Agent API",
     description="An AI agent for resume tailoring, analysis, and cover letter generation.",
-    version="0.2.1" # Updated version
+    version="0.2.1", # Updated version
+    lifespan=lifespan
 )
 
 # Configure CORS to allow the frontend to communicate with this backend
@@ -50,76 +132,316 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Probes and metrics answer from memory; queued behind slow Gemini calls or scrapes they would time out.
+UNLIMITED_PATHS = {"/health", "/ready", "/metrics"}
+
+@app.middleware("http")
+async def limit_concurrency(request: Request, call_next):
+    """Queues requests once MAX_CONCURRENT_REQUESTS are already in progress (except UNLIMITED_PATHS)."""
+    if request.url.path in UNLIMITED_PATHS:
+        return await call_next(request)
+    async with request_slot():
+        return await call_next(request)
+
+# Added after limit_concurrency so oversized requests are turned away without waiting for a slot.
+app.add_middleware(RequestSizeLimitMiddleware)
+
 # --- NLP and Skills Configuration ---
-# Load the spaCy model for Named Entity Recognition (NER)
-nlp = spacy.load("en_core_web_sm")
-
-# A predefined list of skills for simple keyword matching.
-SKILLS_LIST = [
-    "python", "java", "c++", "c", "c#", "javascript", "typescript", "html", "css",
-    "react", "angular", "vue.js", "next.js", "fastapi", "node.js", "django", "flask",
-    "sql", "mysql", "postgresql", "mongodb", "redis",
-    "aws", "azure", "google cloud", "gcp", "docker", "kubernetes", "terraform",
-    "git", "github", "gitlab", "jira", "tailwind css",
-    "machine learning", "deep learning", "tensorflow", "pytorch", "scikit-learn",
-    "data analysis", "pandas", "numpy", "nlp", "computer vision",
-    "project management", "agile", "scrum", "product management"
-]
+# Load the spaCy model for Named Entity Recognition (NER), without unused components
+nlp = LazyHandle("spaCy pipeline", load_nlp)
+
+# Compiled once at startup; matching is a single pass over the text.
+skill_matcher = SkillMatcher(SKILLS_LIST, SKILL_ALIASES)
+# Column layout used to score many job descriptions at once.
+skill_index = SkillIndex(SKILLS_LIST)
+
+# Token budgets for the resume / job description excerpts sent to Gemini (see prompt_builder.py).
+PROMPT_RESUME_TOKENS = int(os.environ.get("PROMPT_RESUME_TOKENS", 700))
+PROMPT_JD_TOKENS = int(os.environ.get("PROMPT_JD_TOKENS", 350))
+
+# Limits for /analyze/batch
+BATCH_MAX_JOB_DESCRIPTIONS = int(os.environ.get("BATCH_MAX_JOB_DESCRIPTIONS", 500))
+NLP_BATCH_SIZE = int(os.environ.get("NLP_BATCH_SIZE", 64))
+# nlp.pipe processes for /analyze/batch. Above 1, spaCy forks them from an I/O thread of this
+# (multithreaded) server, so it is operator config, capped at the core count, never a request field.
+NLP_N_PROCESS = max(1, min(int(os.environ.get("NLP_N_PROCESS", 1)), os.cpu_count() or 1))
+
+# --- Analysis Cache ---
+# Parsed resumes and NLP results keyed by a hash of the uploaded bytes / JD text.
+analysis_cache = AnalysisCache(
+    max_entries=int(os.environ.get("ANALYSIS_CACHE_SIZE", 256)),
+    ttl_seconds=float(os.environ.get("ANALYSIS_CACHE_TTL", 3600)),
+    disk_dir=os.environ.get("ANALYSIS_CACHE_DIR") or None,
+    max_disk_entries=int(os.environ.get("ANALYSIS_CACHE_DISK_MAX", 10000))
+)
+
+# --- Job Search Cache ---
+# Scrape results per (search terms, location, sites, max_results); stale entries are served while refreshing.
+job_search_cache = JobSearchCache(
+    ttl_seconds=float(os.environ.get("JOB_CACHE_TTL", 900)),
+    stale_seconds=float(os.environ.get("JOB_CACHE_STALE", 3600)),
+    max_entries=int(os.environ.get("JOB_CACHE_SIZE", 512)),
+    max_concurrent_refreshes=int(os.environ.get("JOB_CACHE_REFRESHES", 4))
+)
+JOB_SEARCH_MAX_RESULTS = 10
+# Listings scraped per search and re-ranked against the resume before the top results are returned.
+JOB_RANK_CANDIDATES = int(os.environ.get("JOB_RANK_CANDIDATES", 50))
+
+# --- Local Job Index ---
+# With JOB_INDEX_ENABLED=1, a background worker scrapes JOB_INDEX_QUERIES into a SQLite index
+# and /find-jobs/ is answered from it (falling back to a live scrape when it has no matches).
+JOB_INDEX_ENABLED = os.environ.get("JOB_INDEX_ENABLED", "0") == "1"
+job_index = JobIndex(os.environ.get("JOB_INDEX_DB", "job_index.sqlite3")) if JOB_INDEX_ENABLED else None
+job_ingestion_worker = JobIngestionWorker(
+    job_index,
+    skill_extractor=lambda text: skill_matcher.find(text),
+    queries=[q.strip() for q in os.environ.get("JOB_INDEX_QUERIES", "software engineer,data scientist").split(",") if q.strip()],
+    locations=[l.strip() for l in os.environ.get("JOB_INDEX_LOCATIONS", "remote").split(",") if l.strip()],
+    interval_seconds=float(os.environ.get("JOB_INDEX_INTERVAL", 3600)),
+    max_results=int(os.environ.get("JOB_INDEX_RESULTS", 50)),
+    max_age_seconds=float(os.environ.get("JOB_INDEX_MAX_AGE", 7 * 24 * 3600))
+) if job_index else None
+# server.py clears this on all workers but one: the index file is shared, so one ingestion loop is enough.
+run_job_ingestion = True
+
+# --- Async Tasks ---
+# /tasks/* endpoints queue slow work (Gemini, scraping) and return a task id at once.
+# TASK_STORE=sqlite keeps records in TASK_DB, which all server.py workers can read.
+if os.environ.get("TASK_STORE", "memory").lower() == "sqlite":
+    task_store = SQLiteTaskStore(os.environ.get("TASK_DB", "tasks.sqlite3"))
+else:
+    task_store = InMemoryTaskStore()
+task_queue = TaskQueue(
+    task_store,
+    workers=int(os.environ.get("TASK_WORKERS", 4)),
+    max_queued=int(os.environ.get("TASK_MAX_QUEUED", 100)),
+    result_ttl_seconds=float(os.environ.get("TASK_RESULT_TTL", 3600)),
+    webhook_allowed_hosts=[h.strip() for h in os.environ.get("WEBHOOK_ALLOWED_HOSTS", "").split(",") if h.strip()]
+)
+
+# --- Resume Editing Sessions ---
+# /sessions keep per-paragraph analysis of a resume being edited, so re-analysis only covers changed paragraphs.
+resume_sessions = ResumeSessionStore(
+    max_sessions=int(os.environ.get("SESSION_MAX", 1000)),
+    ttl_seconds=float(os.environ.get("SESSION_TTL", 3600))
+)
+# Paragraph analyses shared between sessions (e.g. a session recreated after expiry). Kept apart from
+# analysis_cache so that one long resume does not evict the cached resume and job description analyses.
+paragraph_cache = AnalysisCache(
+    max_entries=int(os.environ.get("PARAGRAPH_CACHE_SIZE", 4096)),
+    ttl_seconds=resume_sessions.ttl_seconds
+)
+
+# --- Observability ---
+# Stage timers (metrics.timed_stage) feed /metrics and, with SERVER_TIMING=1, a Server-Timing
+# header on each response. PROFILER_ENABLED=1 exposes the /debug/profiler endpoints.
+SERVER_TIMING_ENABLED = os.environ.get("SERVER_TIMING", "0") == "1"
+PROFILER_ENABLED = os.environ.get("PROFILER_ENABLED", "0") == "1"
+profiler = SamplingProfiler()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "resume_agent_request_seconds", "Time until the response headers are sent, by route and status.",
+    ["method", "route", "status"]
+)
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "resume_agent_requests_in_flight", "Requests received and not yet answered (including those waiting for a slot)."
+)
+JOB_SITE_REQUESTS = REGISTRY.counter(
+    "resume_agent_job_site_requests_total", "Live job-site scrapes by site and outcome (ok or error).", ["site", "outcome"]
+)
+UPLOADS = REGISTRY.counter(
+    "resume_agent_uploads_total", "Resume uploads read, by where they were buffered (memory or disk).", ["storage"]
+)
+
+
+def collect_service_metrics():
+    """Exports the counters the gateway, caches and task queue already keep."""
+    if llm_gateway:
+        gateway = llm_gateway.metrics
+        yield ("resume_agent_llm_calls_total", "counter", "Gemini calls (including retries) by outcome.",
+               [({"outcome": "ok"}, gateway.calls - gateway.failed_calls), ({"outcome": "error"}, gateway.failed_calls)])
+        yield ("resume_agent_llm_requests_total", "counter", "Generation requests by outcome after retries.",
+               [({"outcome": "error"}, gateway.errors), ({"outcome": "coalesced"}, gateway.coalesced),
+                ({"outcome": "total"}, gateway.requests)])
+        yield ("resume_agent_llm_retries_total", "counter", "Gemini calls retried.", [({}, gateway.retries)])
+        yield ("resume_agent_llm_timeouts_total", "counter", "Gemini calls that timed out.", [({}, gateway.timeouts)])
+        yield ("resume_agent_llm_rate_limited_total", "counter", "Gemini calls rejected for quota.", [({}, gateway.rate_limited)])
+        yield ("resume_agent_llm_in_flight", "gauge", "Gemini calls in progress.", [({}, gateway.in_flight)])
+
+    caches = {"llm_responses": llm_cache.snapshot(), "analysis": analysis_cache.snapshot(),
+              "paragraphs": paragraph_cache.snapshot(), "job_search": job_search_cache.snapshot()}
+    yield ("resume_agent_cache_lookups_total", "counter", "Cache lookups by cache and result (e.g. memory_hits, misses).",
+           [({"cache": name, "result": key}, value) for name, stats in caches.items()
+            for key, value in stats.items() if key.endswith(("_hits", "misses"))])
+    yield ("resume_agent_cache_hit_ratio", "gauge", "Hits / lookups since the process started.",
+           [({"cache": name}, stats["hit_ratio"]) for name, stats in caches.items()])
+
+    tasks = task_queue.snapshot()
+    yield ("resume_agent_tasks_queued", "gauge", "Tasks waiting for a task worker.", [({}, tasks["queued"])])
+    yield ("resume_agent_tasks_running", "gauge", "Tasks being processed.", [({}, tasks["running"])])
+    yield ("resume_agent_tasks_total", "counter", "Tasks by outcome.",
+           [({"outcome": outcome}, tasks[outcome]) for outcome in ("submitted", "rejected", "succeeded", "failed")])
+
+
+REGISTRY.register_collector(collect_service_metrics)
+
+
+@app.middleware("http")
+async def observe_request(request: Request, call_next):
+    """Records latency and in-flight requests, and adds a Server-Timing header when enabled."""
+    timings = start_request_timing()
+    REQUESTS_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        REQUESTS_IN_FLIGHT.dec()
+        # The route template, not the raw path, so /tasks/{task_id} stays one series.
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        REQUEST_SECONDS.observe(elapsed, method=request.method, route=route, status=str(status))
+    if SERVER_TIMING_ENABLED:
+        response.headers["Server-Timing"] = server_timing_header(timings, elapsed)
+    return response
 
 # --- Core Service Functions ---
 
-def extract_text_from_resume(file: UploadFile) -> str:
-    """Extracts raw text from an uploaded PDF or DOCX file."""
+SUPPORTED_EXTENSIONS = ("pdf", "docx")
+
+def get_file_extension(file: UploadFile) -> str:
+    """Returns the lowercase extension of an upload, rejecting unsupported types."""
     file_extension = file.filename.split('.')[-1].lower()
-    file_content = io.BytesIO(file.file.read())
-    text = ""
-    
-    if file_extension == 'pdf':
-        try:
-            with pdfplumber.open(file_content) as pdf:
-                for page in pdf.pages:
-                    text += (page.extract_text() or "") + "\n"
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error processing PDF: {e}")
-    elif file_extension == 'docx':
-        try:
-            doc = docx.Document(file_content)
-            for para in doc.paragraphs:
-                text += para.text + "\n"
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error processing DOCX: {e}")
-    else:
+    if file_extension not in SUPPORTED_EXTENSIONS:
         raise HTTPException(status_code=415, detail="Unsupported file type. Please upload PDF or DOCX.")
-        
-    return text
+    return file_extension
 
-def analyze_text_with_nlp(text: str) -> dict:
-    """Analyzes text to find named entities and matching skills from SKILLS_LIST."""
-    doc = nlp(text)
-    
-    # Extract named entities (like names, organizations, etc.)
-    entities = {}
-    for ent in doc.ents:
-        if ent.label_ not in entities:
-            entities[ent.label_] = []
-        entities[ent.label_].append(ent.text.strip())
-    # De-duplicate entities
-    for label, items in entities.items():
-        entities[label] = sorted(list(set(items)))
+async def read_upload(file: UploadFile) -> SpooledUpload:
+    """
+    Hashes a resume upload where Starlette spooled it (in memory or, above UPLOAD_SPOOL_BYTES, a
+    temp file), rejecting it when it exceeds RESUME_MAX_BYTES. Close the result when done with it.
+    """
+    upload = await spool_upload(file, get_file_extension(file), MAX_UPLOAD_BYTES)
+    UPLOADS.inc(storage="disk" if upload.spilled else "memory")
+    return upload
+
+async def extract_text_from_upload(upload: SpooledUpload) -> str:
+    """Parses a resume upload in the CPU pool, converting parser errors into HTTP 400s."""
+    try:
+        with timed_stage("extract_text_from_resume"):
+            return await extract_text(upload.source(), upload.extension)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error processing {upload.extension.upper()}: {e}")
+
+async def extract_text_from_resume(file: UploadFile) -> str:
+    """Extracts raw text from an uploaded PDF or DOCX file."""
+    with await read_upload(file) as upload:
+        return await extract_text_from_upload(upload)
+
+def extract_entities(text: str) -> dict:
+    """Runs spaCy NER and groups the de-duplicated entity texts by label."""
+    return doc_entities(nlp(text))
+
+def analyze_text_with_nlp(text: str, with_entities: bool = True) -> dict:
+    """
+    Analyzes text to find named entities and matching skills from SKILLS_LIST.
+    With with_entities=False the spaCy pass is skipped and 'entities' is None.
+    """
+    entities = extract_entities(text) if with_entities else None
         
-    # Find skills using a simple text search
-    found_skills = {skill for skill in SKILLS_LIST if skill in text.lower()}
+    # Find skills with the compiled multi-pattern matcher
+    found_skills = skill_matcher.find(text)
     
     return {"entities": entities, "skills": sorted(list(found_skills))}
 
-def generate_suggestions(resume_text: str, missing_skills: list) -> str:
-    """Uses the Gemini model to generate resume enhancement suggestions."""
-    if not model:
-        return "Error: Gemini client not initialized."
-    if not missing_skills:
-        return "No missing skills identified. The resume appears well-aligned."
+def analyze_texts_with_nlp(texts: List[str], with_entities: bool = True, batch_size: int = NLP_BATCH_SIZE, n_process: int = 1) -> List[dict]:
+    """Batch version of analyze_text_with_nlp; NER runs through nlp.pipe when entities are needed."""
+    if with_entities:
+        docs = nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+    else:
+        docs = [None] * len(texts)
+
+    results = []
+    for text, doc in zip(texts, docs):
+        entities = doc_entities(doc) if doc is not None else None
+        results.append({"entities": entities, "skills": sorted(skill_matcher.find(text))})
+    return results
+
+def rank_job_listings(resume_text: str, resume_skills: List[str], jobs: List[dict], top_k: int) -> List[dict]:
+    """
+    Orders scraped listings by relevance to the resume (skill coverage + TF-IDF similarity).
+    Adds relevance_score and matched/missing skills, and drops descriptions. Runs in the CPU pool.
+    """
+    from job_ranking import rank_jobs  # pulls in scipy; only needed once a search is ranked
+
+    job_texts = [f"{job.get('title', '')}\n{job.get('description', '')}" for job in jobs]
+    job_skills = [skill_matcher.find(text) for text in job_texts]
+    ranked = []
+    for ranking in rank_jobs(resume_text, resume_skills, job_texts, job_skills, skill_index, top_k):
+        job = {key: value for key, value in jobs[ranking["job_index"]].items() if key != "description"}
+        ranked.append({
+            **job,
+            "relevance_score": ranking["relevance_score"],
+            "matched_skills": ranking["matched_skills"],
+            "missing_skills": ranking["missing_skills"],
+        })
+    return ranked
+
+async def analyze_resume_file(file: UploadFile, with_entities: bool = False) -> dict:
+    """
+    Extracts and analyzes an uploaded resume, reusing cached results for identical files.
+    Returns a dict with 'text', 'entities' and 'skills'; NER only runs when entities are requested.
+    """
+    with await read_upload(file) as upload:
+        return await analyze_resume_content(upload, with_entities)
+
+async def analyze_resume_content(upload: SpooledUpload, with_entities: bool = False) -> dict:
+    """analyze_resume_file for an upload that was already read (e.g. by a queued task)."""
+    with_entities = entities_needed(with_entities)
+    # Hashed while it was read, so a known resume is answered without touching its bytes again.
+    cache_key = f"resume:{upload.sha256}"
+    cached = await analysis_cache.get_async(cache_key)
+    if cached is not None:
+        if with_entities and cached["entities"] is None:
+            # Parsed before without NER: only the entity pass is missing.
+            with timed_stage("extract_entities"):
+                cached = {**cached, "entities": await run_cpu(extract_entities, cached["text"])}
+            await analysis_cache.set_async(cache_key, cached)
+        return cached
+
+    resume_text = await extract_text_from_upload(upload)
+    if not resume_text:
+        raise HTTPException(status_code=400, detail="Could not extract text from resume.")
+
+    with timed_stage("analyze_text_with_nlp"):
+        analysis = await run_cpu(analyze_text_with_nlp, resume_text, with_entities)
+    result = {"text": resume_text, **analysis}
+    await analysis_cache.set_async(cache_key, result)
+    return result
+
+async def analyze_job_description(job_description: str, with_entities: bool = False) -> dict:
+    """Analyzes a job description, reusing cached results for identical text."""
+    with_entities = entities_needed(with_entities)
+    cache_key = f"jd:{hash_text(job_description)}"
+    cached = await analysis_cache.get_async(cache_key)
+    if cached is not None:
+        if with_entities and cached["entities"] is None:
+            with timed_stage("extract_entities"):
+                cached = {**cached, "entities": await run_cpu(extract_entities, job_description)}
+            await analysis_cache.set_async(cache_key, cached)
+        return cached
 
-    prompt = f"""
+    with timed_stage("analyze_text_with_nlp"):
+        result = await run_cpu(analyze_text_with_nlp, job_description, with_entities)
+    await analysis_cache.set_async(cache_key, result)
+    return result
+
+def build_suggestions_prompt(resume_text: str, missing_skills: list) -> str:
+    """Builds the Gemini prompt for resume enhancement suggestions."""
+    # The bullets closest to the missing skills are the ones worth rewriting.
+    resume_excerpt = select_relevant_text(resume_text, skill_matcher.find, missing_skills, PROMPT_RESUME_TOKENS)
+    return f"""
     You are an expert career coach. Your task is to rewrite one or two bullet points
     from the provided resume to naturally include the following missing skills: {', '.join(missing_skills)}.
     Do not invent new experiences. Enhance existing points subtly.
@@ -127,24 +449,19 @@ def generate_suggestions(resume_text: str, missing_skills: list) -> str:
 
     **Original Resume Text (excerpt):**
     ---
-    {resume_text[:4000]}
+    {resume_excerpt}
     ---
     """
-    try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    except Exception as e:
-        return f"Error calling Gemini API: {e}"
-
-def generate_cover_letter_text(resume_text: str, job_description: str, matched_skills: list, resume_highlights: dict) -> str:
-    """Generates a personalized cover letter using the Gemini API."""
-    if not model:
-        return "Error: Gemini client not initialized."
 
+def build_cover_letter_prompt(resume_text: str, job_description: str, matched_skills: list, resume_highlights: dict) -> str:
+    """Builds the Gemini prompt for a cover letter."""
     person_name = resume_highlights.get("PERSON", ["the candidate"])[0]
     organizations = resume_highlights.get("ORG", [])
+    resume_excerpt = select_relevant_text(resume_text, skill_matcher.find, matched_skills, PROMPT_RESUME_TOKENS)
+    # The lead names the position, which the letter's first paragraph has to state.
+    job_excerpt = select_relevant_text(job_description, skill_matcher.find, matched_skills, PROMPT_JD_TOKENS, keep_lead=True)
     
-    prompt = f"""
+    return f"""
     You are an expert career coach writing a concise, three-paragraph cover letter
     from the perspective of {person_name}. The tone must be professional and enthusiastic.
 
@@ -156,18 +473,130 @@ def generate_cover_letter_text(resume_text: str, job_description: str, matched_s
     **Matched Skills to Highlight:** {', '.join(matched_skills)}
     **Job Description:**
     ---
-    {job_description[:2000]}
+    {job_excerpt}
     ---
     **Candidate's Resume:**
     ---
-    {resume_text[:4000]}
+    {resume_excerpt}
     ---
     """
+
+async def generate_text(prompt: str) -> str:
+    """Sends a prompt through the LLM gateway, turning failures into HTTP errors."""
+    if not llm_gateway:
+        raise HTTPException(status_code=503, detail="Gemini client not initialized.")
+    try:
+        return await llm_gateway.generate(prompt)
+    except LLMError as e:
+        raise HTTPException(status_code=e.status_code, detail=f"Error calling Gemini API: {e}")
+
+async def generate_suggestions(resume_text: str, missing_skills: list) -> str:
+    """Uses the Gemini model to generate resume enhancement suggestions."""
+    if not missing_skills:
+        return "No missing skills identified. The resume appears well-aligned."
+
+    prompt = build_suggestions_prompt(resume_text, missing_skills)
+    with timed_stage("generate_suggestions"):
+        return await generate_text(prompt)
+
+async def generate_cover_letter_text(resume_text: str, job_description: str, matched_skills: list, resume_highlights: dict) -> str:
+    """Generates a personalized cover letter using the Gemini API."""
+    prompt = build_cover_letter_prompt(resume_text, job_description, matched_skills, resume_highlights)
+    with timed_stage("generate_cover_letter_text"):
+        return await generate_text(prompt)
+
+# --- Streaming (Server-Sent Events) ---
+
+def sse_event(event: str, data) -> str:
+    """Formats one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_gemini_events(prompt: str):
+    """Streams a Gemini generation through the gateway as 'token' events followed by 'done'."""
+    if not llm_gateway:
+        yield sse_event("error", {"detail": "Gemini client not initialized."})
+        return
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        with timed_stage("stream_gemini"):
+            async for text in llm_gateway.stream(prompt):
+                yield sse_event("token", {"text": text})
+    except LLMError as e:
+        yield sse_event("error", {"detail": f"Error calling Gemini API: {e}", "status_code": e.status_code})
+        return
+    yield sse_event("done", {})
+
+def event_stream_response(events) -> StreamingResponse:
+    """Wraps an async generator of SSE strings in a non-buffered streaming response."""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def compare_skills(resume_analysis: dict, jd_analysis: dict) -> dict:
+    """Computes the matching score and matched/missing skills between a resume and a JD."""
+    required_skills = set(jd_analysis["skills"])
+    resume_skills = set(resume_analysis["skills"])
+    matched_skills = required_skills.intersection(resume_skills)
+    missing_skills = required_skills.difference(resume_skills)
+
+    matching_score = 0
+    if required_skills:
+        matching_score = round((len(matched_skills) / len(required_skills)) * 100)
+
+    return {
+        "matching_score_percent": matching_score,
+        "matched_skills": sorted(list(matched_skills)),
+        "missing_skills": sorted(list(missing_skills)),
+    }
+
+# --- Startup Warmup and Readiness ---
+# WARMUP=0 skips the synthetic-document pass (models are still loaded before serving).
+WARMUP_ENABLED = os.environ.get("WARMUP", "1") == "1"
+WARMUP_TEXT = (
+    "Jane Doe, Software Engineer at Acme Corp in Berlin.\n"
+    "Built REST APIs with Python, FastAPI and PostgreSQL; deployed with Docker and Kubernetes on AWS.\n"
+    "Led a team of four engineers and mentored interns in machine learning and data analysis."
+)
+
+readiness = {"ready": False, "warmup_seconds": None, "error": None}
+
+
+def make_warmup_docx(text: str) -> bytes:
+    """A small in-memory DOCX resume used to exercise the extraction path."""
+    import docx
+
+    document = docx.Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def load_models():
+    """Loads the spaCy pipeline and document parsers in this process, before any CPU worker forks."""
+    preload_parsers()
+    nlp.get()
+
+
+async def warmup():
+    """
+    Creates the LLM client and runs a synthetic resume through extraction, NLP and skill
+    matching on every CPU worker, so the first real request does not pay for it.
+    """
+    start = time.perf_counter()
+    try:
+        if model:
+            await run_io(model.get)
+        text = await extract_text(await run_io(make_warmup_docx, WARMUP_TEXT), "docx")
+        await asyncio.gather(*(run_cpu(analyze_text_with_nlp, text, True) for _ in range(max(CPU_WORKERS, 1))))
+        readiness["ready"] = True
     except Exception as e:
-        return f"Error calling Gemini API: {e}"
+        print(f"Warmup failed: {e}")
+        readiness["error"] = str(e)
+    readiness["warmup_seconds"] = round(time.perf_counter() - start, 3)
+
 
 # --- API Endpoints ---
 
@@ -176,35 +605,193 @@ async def root():
     """Root endpoint to check if the API is running."""
     return {"message": "Welcome to the Resume Improvement Agent API!"}
 
+@app.get("/health")
+async def health():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "alive"}
+
+@app.get("/ready")
+async def ready(response: Response):
+    """Readiness probe: 200 once warmup has loaded the models, 503 until then (or if warmup failed)."""
+    if not readiness["ready"]:
+        response.status_code = 503
+    return {
+        **readiness,
+        "models": {
+            "spacy": nlp.loaded,
+            "llm": model.loaded if model else None,
+        },
+    }
+
 @app.post("/analyze/")
 async def analyze_resume_and_jd(
     resume_file: Annotated[UploadFile, File(description="User's resume (PDF, DOCX).")],
     job_description: Annotated[str, Form(description="The job description text.")]
 ):
     """Analyzes resume against a job description and provides improvement suggestions."""
-    resume_text = extract_text_from_resume(resume_file)
-    if not resume_text:
-        raise HTTPException(status_code=400, detail="Could not extract text from resume.")
+    resume_analysis, jd_analysis = await asyncio.gather(
+        analyze_resume_file(resume_file),
+        analyze_job_description(job_description)
+    )
+    resume_text = resume_analysis["text"]
+    comparison = compare_skills(resume_analysis, jd_analysis)
 
-    resume_analysis = analyze_text_with_nlp(resume_text)
-    jd_analysis = analyze_text_with_nlp(job_description)
+    enhancement_suggestions = await generate_suggestions(resume_text, comparison["missing_skills"])
 
-    required_skills = set(jd_analysis["skills"])
-    resume_skills = set(resume_analysis["skills"])
-    matched_skills = required_skills.intersection(resume_skills)
-    missing_skills = list(required_skills.difference(resume_skills))
+    return {
+        "matching_score_percent": comparison["matching_score_percent"],
+        "enhancement_suggestions": enhancement_suggestions,
+        "matched_skills": comparison["matched_skills"],
+        "missing_skills": comparison["missing_skills"],
+    }
 
-    matching_score = 0
-    if required_skills:
-        matching_score = round((len(matched_skills) / len(required_skills)) * 100)
+@app.post("/analyze/with-cover-letter")
+async def analyze_with_cover_letter(
+    resume_file: Annotated[UploadFile, File(description="User's resume (PDF, DOCX).")],
+    job_description: Annotated[str, Form(description="The job description text.")]
+):
+    """
+    /analyze/ and /generate-cover-letter/ in one request: the resume and job description are
+    extracted and analyzed once, then the suggestions and the cover letter are generated concurrently.
+    A failed generation is reported in its *_error field without discarding the other result.
+    """
+    started = time.perf_counter()
+    with await read_upload(resume_file) as upload:
+        resume_analysis, jd_analysis = await asyncio.gather(
+            analyze_resume_content(upload, with_entities=True),
+            analyze_job_description(job_description)
+        )
+    comparison = compare_skills(resume_analysis, jd_analysis)
+    analysis_seconds = time.perf_counter() - started
+
+    async def cover_letter():
+        if not comparison["matched_skills"]:
+            raise HTTPException(status_code=400, detail="No matching skills found to generate a compelling cover letter.")
+        return await generate_cover_letter_text(
+            resume_text=resume_analysis["text"],
+            job_description=job_description,
+            matched_skills=comparison["matched_skills"],
+            resume_highlights=resume_analysis.get("entities") or {}
+        )
+
+    generation_started = time.perf_counter()
+    suggestions, cover_letter_text = await asyncio.gather(
+        generate_suggestions(resume_analysis["text"], comparison["missing_skills"]),
+        cover_letter(),
+        return_exceptions=True
+    )
+    generation_seconds = time.perf_counter() - generation_started
+    total_seconds = time.perf_counter() - started
+
+    result = {**comparison, "enhancement_suggestions": None, "cover_letter_text": None}
+    for field, error_field, value in (("enhancement_suggestions", "suggestions_error", suggestions),
+                                      ("cover_letter_text", "cover_letter_error", cover_letter_text)):
+        if isinstance(value, HTTPException):
+            result[error_field] = value.detail
+        elif isinstance(value, BaseException):
+            raise value
+        else:
+            result[field] = value
+
+    # What the two endpoints would have taken back to back: the analysis twice, the generations in turn.
+    stage_seconds = {}
+    for stage, seconds in request_timings():
+        stage_seconds[stage] = stage_seconds.get(stage, 0.0) + seconds
+    sequential_seconds = (2 * analysis_seconds + stage_seconds.get("generate_suggestions", 0.0)
+                          + stage_seconds.get("generate_cover_letter_text", 0.0))
+    result["timings_ms"] = {
+        "analysis": round(analysis_seconds * 1000, 1),
+        "suggestions": round(stage_seconds.get("generate_suggestions", 0.0) * 1000, 1),
+        "cover_letter": round(stage_seconds.get("generate_cover_letter_text", 0.0) * 1000, 1),
+        "generation": round(generation_seconds * 1000, 1),
+        "total": round(total_seconds * 1000, 1),
+        "separate_requests_estimate": round(sequential_seconds * 1000, 1),
+        "saved_estimate": round(max(0.0, sequential_seconds - total_seconds) * 1000, 1),
+    }
+    return result
+
+@app.post("/analyze/stream")
+async def analyze_resume_and_jd_stream(
+    resume_file: Annotated[UploadFile, File(description="User's resume (PDF, DOCX).")],
+    job_description: Annotated[str, Form(description="The job description text.")]
+):
+    """
+    Streaming variant of /analyze/. Sends an 'analysis' event with the score and skills first,
+    then the Gemini suggestions as 'token' events, then 'done'.
+    """
+    resume_analysis, jd_analysis = await asyncio.gather(
+        analyze_resume_file(resume_file),
+        analyze_job_description(job_description)
+    )
+    comparison = compare_skills(resume_analysis, jd_analysis)
+
+    async def events():
+        yield sse_event("analysis", comparison)
+        if not comparison["missing_skills"]:
+            yield sse_event("token", {"text": "No missing skills identified. The resume appears well-aligned."})
+            yield sse_event("done", {})
+            return
+        prompt = build_suggestions_prompt(resume_analysis["text"], comparison["missing_skills"])
+        async for event in stream_gemini_events(prompt):
+            yield event
+
+    return event_stream_response(events())
 
-    enhancement_suggestions = generate_suggestions(resume_text, missing_skills)
+@app.post("/analyze/batch")
+async def analyze_resume_against_many(
+    resume_file: Annotated[UploadFile, File(description="User's resume (PDF, DOCX).")],
+    job_descriptions: Annotated[List[str], Form(description="Job description texts (repeat the field once per job).")],
+    suggestions_top_k: Annotated[int, Form(description="Generate Gemini suggestions for the best k matches.")] = 0,
+    include_entities: Annotated[bool, Form(description="Run NER on every job description and return the entities.")] = False,
+    batch_size: Annotated[int, Form(description="spaCy nlp.pipe batch size.")] = NLP_BATCH_SIZE
+):
+    """Scores one resume against many job descriptions and returns them ranked by match."""
+    if not job_descriptions:
+        raise HTTPException(status_code=400, detail="At least one job description is required.")
+    if len(job_descriptions) > BATCH_MAX_JOB_DESCRIPTIONS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_JOB_DESCRIPTIONS} job descriptions per request.")
+
+    resume_analysis = await analyze_resume_file(resume_file)
+    resume_text = resume_analysis["text"]
+
+    with_entities = entities_needed(include_entities)
+    batch_size = max(1, batch_size)
+    if NLP_N_PROCESS > 1 and with_entities:
+        # spaCy starts its own worker processes, which the (daemonic) CPU pool cannot do.
+        with timed_stage("analyze_texts_with_nlp"):
+            jd_analyses = await run_io(analyze_texts_with_nlp, job_descriptions, with_entities, batch_size, NLP_N_PROCESS)
+    else:
+        with timed_stage("analyze_texts_with_nlp"):
+            jd_analyses = await run_cpu(analyze_texts_with_nlp, job_descriptions, with_entities, batch_size)
+
+    scores = score_skill_matches(skill_index, resume_analysis["skills"], [jd["skills"] for jd in jd_analyses])
+    results = []
+    for i, (score, jd) in enumerate(zip(scores, jd_analyses)):
+        result = {"job_index": i, **score}
+        if with_entities:
+            result["entities"] = jd["entities"]
+        results.append(result)
+    results.sort(key=lambda r: r["matching_score_percent"], reverse=True)
+
+    top_results = results[:max(0, suggestions_top_k)]
+    suggestions = await asyncio.gather(
+        *(generate_suggestions(resume_text, r["missing_skills"]) for r in top_results),
+        return_exceptions=True
+    )
+    for result, suggestion in zip(top_results, suggestions):
+        if isinstance(suggestion, HTTPException):
+            # One failed generation should not discard the whole ranking.
+            result["enhancement_suggestions"] = None
+            result["suggestions_error"] = suggestion.detail
+        elif isinstance(suggestion, BaseException):
+            raise suggestion
+        else:
+            result["enhancement_suggestions"] = suggestion
 
     return {
-        "matching_score_percent": matching_score,
-        "enhancement_suggestions": enhancement_suggestions,
-        "matched_skills": sorted(list(matched_skills)),
-        "missing_skills": sorted(list(missing_skills)),
+        "job_count": len(results),
+        "resume_skills": resume_analysis["skills"],
+        "results": results,
     }
 
 @app.post("/generate-cover-letter/")
@@ -213,47 +800,83 @@ async def create_cover_letter(
     job_description: Annotated[str, Form(description="The job description text.")]
 ):
     """Generates a personalized cover letter based on the resume and job description."""
-    resume_text = extract_text_from_resume(resume_file)
-    if not resume_text:
-        raise HTTPException(status_code=400, detail="Could not extract text from resume.")
+    with await read_upload(resume_file) as upload:
+        return await build_cover_letter(upload, job_description)
 
-    resume_analysis = analyze_text_with_nlp(resume_text)
-    jd_analysis = analyze_text_with_nlp(job_description)
-
-    required_skills = set(jd_analysis["skills"])
-    resume_skills = set(resume_analysis["skills"])
-    matched_skills = list(required_skills.intersection(resume_skills))
+async def build_cover_letter(upload: SpooledUpload, job_description: str) -> dict:
+    """Body of /generate-cover-letter/, shared with the queued task."""
+    resume_analysis, jd_analysis = await asyncio.gather(
+        analyze_resume_content(upload, with_entities=True),
+        analyze_job_description(job_description)
+    )
+    resume_text = resume_analysis["text"]
+    matched_skills = compare_skills(resume_analysis, jd_analysis)["matched_skills"]
     
     if not matched_skills:
         raise HTTPException(status_code=400, detail="No matching skills found to generate a compelling cover letter.")
 
-    cover_letter = generate_cover_letter_text(
+    cover_letter = await generate_cover_letter_text(
         resume_text=resume_text,
         job_description=job_description,
         matched_skills=matched_skills,
-        resume_highlights=resume_analysis.get("entities", {})
+        resume_highlights=resume_analysis.get("entities") or {}
     )
 
     return {"cover_letter_text": cover_letter}
 
+@app.post("/generate-cover-letter/stream")
+async def create_cover_letter_stream(
+    resume_file: Annotated[UploadFile, File(description="User's resume (PDF, DOCX).")],
+    job_description: Annotated[str, Form(description="The job description text.")]
+):
+    """
+    Streaming variant of /generate-cover-letter/. Sends the matched skills as an 'analysis'
+    event, then the cover letter as 'token' events, then 'done'.
+    """
+    resume_analysis, jd_analysis = await asyncio.gather(
+        analyze_resume_file(resume_file, with_entities=True),
+        analyze_job_description(job_description)
+    )
+    matched_skills = compare_skills(resume_analysis, jd_analysis)["matched_skills"]
+
+    if not matched_skills:
+        raise HTTPException(status_code=400, detail="No matching skills found to generate a compelling cover letter.")
+
+    prompt = build_cover_letter_prompt(
+        resume_text=resume_analysis["text"],
+        job_description=job_description,
+        matched_skills=matched_skills,
+        resume_highlights=resume_analysis.get("entities") or {}
+    )
+
+    async def events():
+        yield sse_event("analysis", {"matched_skills": matched_skills})
+        async for event in stream_gemini_events(prompt):
+            yield event
+
+    return event_stream_response(events())
+
 # --- UPDATED JOB SEARCH ENDPOINT ---
 @app.post("/find-jobs/")
 async def find_matching_jobs(
     resume_file: Annotated[UploadFile, File(description="User's resume (PDF, DOCX).")],
     # --- ADDED NEW OPTIONAL FIELD ---
     search_query: Annotated[Optional[str], Form(description="Specific job title or query to search for (e.g., 'Python Developer').")] = None,
-    location: Annotated[Optional[str], Form(description="Job location to search for (e.g., 'New York', 'remote').")] = "remote"
+    location: Annotated[Optional[str], Form(description="Job location to search for (e.g., 'New York', 'remote').")] = "remote",
+    rank: Annotated[bool, Form(description="Re-rank scraped listings by relevance to the resume.")] = True
 ):
     """
-    Extracts skills from the resume and searches Indeed for matching job listings.
+    Extracts skills from the resume and searches the configured job sites for matching listings.
     Prioritizes the 'search_query' if provided.
     """
-    resume_text = extract_text_from_resume(resume_file)
-    if not resume_text:
-        raise HTTPException(status_code=400, detail="Could not extract text from resume.")
+    with await read_upload(resume_file) as upload:
+        return await search_jobs_for_resume(upload, search_query, location, rank)
 
+async def search_jobs_for_resume(upload: SpooledUpload, search_query: Optional[str],
+                                 location: Optional[str], rank: bool = True) -> dict:
+    """Body of /find-jobs/, shared with the queued task."""
     # 1. Extract Skills from Resume (we'll return this for context)
-    resume_analysis = analyze_text_with_nlp(resume_text)
+    resume_analysis = await analyze_resume_content(upload)
     extracted_skills = resume_analysis.get("skills", [])
     
     search_terms_list = []
@@ -272,23 +895,294 @@ async def find_matching_jobs(
         # No query and no skills found
         raise HTTPException(status_code=400, detail="No search query provided and no skills found in resume.")
 
-    # 2. Get Job Listings
-    job_listings = scrape_indeed_jobs(
-        search_keywords=search_terms_list,
-        location=location,
-        max_results=10
-    )
+    # 2a. Answer from the local job index when it is enabled and has matches
+    if job_index:
+        with timed_stage("job_index_search"):
+            indexed_jobs = await run_io(
+                job_index.search,
+                extracted_skills,
+                query_terms=search_query.split() if search_query else None,
+                location=location,
+                limit=JOB_SEARCH_MAX_RESULTS
+            )
+        if indexed_jobs:
+            return {
+                "search_source": search_source,
+                "search_terms": search_terms_list,
+                "location_searched": location,
+                "job_count": len(indexed_jobs),
+                "job_listings": indexed_jobs,
+                "listings_source": "index",
+                "all_extracted_skills": extracted_skills
+            }
+
+    # 2b. Get Job Listings (cached; otherwise all configured sites in parallel, failed sites are reported, not fatal)
+    async def scrape():
+        with timed_stage("scrape_job_listings"):
+            result = await run_io(
+                scrape_job_listings,
+                search_keywords=search_terms_list,
+                location=location,
+                max_results=JOB_RANK_CANDIDATES,
+                include_description=True
+            )
+        for site in result["sites_succeeded"]:
+            JOB_SITE_REQUESTS.inc(site=site, outcome="ok")
+        for site in result["sites_failed"]:
+            JOB_SITE_REQUESTS.inc(site=site, outcome="error")
+        return result
+
+    cache_key = make_search_key(search_terms_list, location, JOB_SITES, JOB_RANK_CANDIDATES)
+    scrape_result, cache_status = await job_search_cache.get_or_fetch(cache_key, scrape)
+
+    # 3. Rank the candidates against the resume (or keep scrape order)
+    if rank:
+        with timed_stage("rank_job_listings"):
+            job_listings = await run_cpu(
+                rank_job_listings, resume_analysis["text"], extracted_skills, scrape_result["jobs"], JOB_SEARCH_MAX_RESULTS
+            )
+    else:
+        job_listings = [
+            {key: value for key, value in job.items() if key != "description"}
+            for job in scrape_result["jobs"][:JOB_SEARCH_MAX_RESULTS]
+        ]
 
-    # 3. Return the findings
+    # 4. Return the findings
     return {
         "search_source": search_source, # Info on what we searched for
         "search_terms": search_terms_list,
         "location_searched": location,
         "job_count": len(job_listings),
         "job_listings": job_listings,
+        "listings_source": "live",
+        "sites_searched": scrape_result["sites_succeeded"],
+        "sites_failed": scrape_result["sites_failed"],
+        "cache_status": cache_status,
         "all_extracted_skills": extracted_skills # Return all skills for user info
     }
 
+# --- Async Task Endpoints ---
+
+@contextmanager
+def task_submission_errors():
+    """Answers 429 when the task queue is full and 400 for a webhook the server may not call."""
+    try:
+        yield
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    except WebhookURLError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def read_task_upload(file: UploadFile, webhook_url: Optional[str]) -> SpooledUpload:
+    """Reads the resume of a task once the queue would accept the task, so a refusal costs no read."""
+    with task_submission_errors():
+        await task_queue.admit(webhook_url)
+    return await read_upload(file)
+
+async def submit_task(kind: str, run, upload: SpooledUpload, priority: int, webhook_url: Optional[str]) -> dict:
+    """Queues a task that owns upload, closing the upload if the task is refused."""
+    try:
+        with task_submission_errors():
+            task = await task_queue.submit(kind, run, priority=priority, webhook_url=webhook_url)
+    except BaseException:
+        upload.close()
+        raise
+    return {"task_id": task["task_id"], "status": task["status"], "status_url": f"/tasks/{task['task_id']}"}
+
+@app.post("/tasks/generate-cover-letter", status_code=202)
+async def submit_cover_letter_task(
+    resume_file: Annotated[UploadFile, File(description="User's resume (PDF, DOCX).")],
+    job_description: Annotated[str, Form(description="The job description text.")],
+    priority: Annotated[int, Form(ge=0, le=9, description="Higher runs first.")] = 0,
+    webhook_url: Annotated[Optional[str], Form(description="URL that receives the finished task as a JSON POST.")] = None
+):
+    """Queues /generate-cover-letter/ and returns a task id; poll /tasks/{task_id} or wait for the webhook."""
+    upload = await read_task_upload(resume_file, webhook_url)
+
+    async def run():
+        with upload:
+            return await build_cover_letter(upload, job_description)
+
+    return await submit_task("generate-cover-letter", run, upload, priority, webhook_url)
+
+@app.post("/tasks/find-jobs", status_code=202)
+async def submit_find_jobs_task(
+    resume_file: Annotated[UploadFile, File(description="User's resume (PDF, DOCX).")],
+    search_query: Annotated[Optional[str], Form(description="Specific job title or query to search for (e.g., 'Python Developer').")] = None,
+    location: Annotated[Optional[str], Form(description="Job location to search for (e.g., 'New York', 'remote').")] = "remote",
+    rank: Annotated[bool, Form(description="Re-rank scraped listings by relevance to the resume.")] = True,
+    priority: Annotated[int, Form(ge=0, le=9, description="Higher runs first.")] = 0,
+    webhook_url: Annotated[Optional[str], Form(description="URL that receives the finished task as a JSON POST.")] = None
+):
+    """Queues /find-jobs/ and returns a task id; poll /tasks/{task_id} or wait for the webhook."""
+    upload = await read_task_upload(resume_file, webhook_url)
+
+    async def run():
+        with upload:
+            return await search_jobs_for_resume(upload, search_query, location, rank)
+
+    return await submit_task("find-jobs", run, upload, priority, webhook_url)
+
+@app.get("/tasks/stats")
+async def task_stats():
+    """Reports task queue depth, busy workers and outcome counters."""
+    return task_queue.snapshot()
+
+@app.get("/tasks/{task_id}")
+async def get_task(task_id: str):
+    """Status of a queued task; 'result' holds the endpoint's normal response once it has succeeded."""
+    task = await task_queue.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found (unknown id, or its result has expired).")
+    return task
+
+# --- Resume Editing Session Endpoints ---
+
+async def analyze_paragraphs(paragraphs: Dict[str, str], with_entities: bool) -> Dict[str, Dict]:
+    """analyze_text_with_nlp per paragraph (keyed by paragraph hash), through paragraph_cache."""
+    results, missing = {}, {}
+    for paragraph_hash, text in paragraphs.items():
+        cached = paragraph_cache.get(f"{paragraph_hash}:{int(with_entities)}")
+        if cached is not None:
+            results[paragraph_hash] = cached
+        else:
+            missing[paragraph_hash] = text
+    if missing:
+        with timed_stage("analyze_paragraphs"):
+            analyses = await run_cpu(analyze_texts_with_nlp, list(missing.values()), with_entities)
+        for paragraph_hash, analysis in zip(missing, analyses):
+            paragraph_cache.set(f"{paragraph_hash}:{int(with_entities)}", analysis)
+            results[paragraph_hash] = analysis
+    return results
+
+async def update_session(session, text: str, job_description: Optional[str]) -> dict:
+    """Applies new resume text to a session and returns its analysis (plus a comparison when a JD is given)."""
+    if len(text) > MAX_CHARS:
+        raise HTTPException(status_code=413, detail=f"Resume text is too long (limit {MAX_CHARS} characters).")
+    started = time.perf_counter()
+    async with session.lock:
+        changes = await session.update(text, lambda paragraphs: analyze_paragraphs(paragraphs, session.with_entities))
+        result = {**session.snapshot(), **changes}
+    if job_description:
+        result.update(compare_skills(result, await analyze_job_description(job_description)))
+    result["analysis_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+@app.post("/sessions", status_code=201)
+async def create_session(
+    text: Annotated[str, Form(description="Resume text.")],
+    include_entities: Annotated[bool, Form(description="Also run NER and return entities (fixed for the session).")] = False,
+    job_description: Annotated[Optional[str], Form(description="Optional job description to compare against.")] = None
+):
+    """
+    Starts an editing session for resume text. Send each edited version to PUT /sessions/{session_id}:
+    only paragraphs that changed are re-analyzed, and skills/entities are updated incrementally.
+    """
+    session = resume_sessions.create(entities_needed(include_entities))
+    return await update_session(session, text, job_description)
+
+@app.put("/sessions/{session_id}")
+async def update_session_text(
+    session_id: str,
+    text: Annotated[str, Form(description="The full, edited resume text.")],
+    job_description: Annotated[Optional[str], Form(description="Optional job description to compare against.")] = None
+):
+    """Replaces the session's resume text and returns the updated analysis."""
+    session = resume_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found (unknown id, or it expired). Start a new one with POST /sessions.")
+    return await update_session(session, text, job_description)
+
+@app.get("/sessions/{session_id}")
+async def get_session(session_id: str):
+    """The session's current skills and entities."""
+    session = resume_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found (unknown id, or it expired).")
+    return session.snapshot()
+
+@app.delete("/sessions/{session_id}", status_code=204)
+async def delete_session(session_id: str):
+    if not resume_sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail="Session not found (unknown id, or it expired).")
+    return Response(status_code=204)
+
+@app.get("/jobs/index/stats")
+async def job_index_stats():
+    """Reports the size of the local job index and when it was last refreshed."""
+    if not job_index:
+        raise HTTPException(status_code=404, detail="Local job index is disabled (set JOB_INDEX_ENABLED=1).")
+    return {
+        "indexed_jobs": await run_io(job_index.count),
+        # Only set in the process that runs the ingestion loop.
+        "last_ingestion": job_ingestion_worker.last_run,
+        "ingesting_in_this_worker": run_job_ingestion,
+        "queries": job_ingestion_worker.queries,
+        "locations": job_ingestion_worker.locations,
+    }
+
+@app.get("/llm/metrics")
+async def llm_metrics():
+    """Reports LLM gateway counters: queue wait vs. model latency, retries, coalescing, errors."""
+    if not llm_gateway:
+        raise HTTPException(status_code=503, detail="Gemini client not initialized.")
+    return {"model": llm_gateway.model_name, **llm_gateway.metrics.snapshot()}
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Reports hit/miss counters for the LLM response, analysis and job-search caches."""
+    return {
+        "llm_responses": await run_io(llm_cache.snapshot),
+        "analysis": analysis_cache.snapshot(),
+        "paragraphs": paragraph_cache.snapshot(),
+        "job_search": job_search_cache.snapshot(),
+    }
+
+@app.get("/memory")
+async def memory():
+    """Memory of the worker process that serves this request (see server.py for all workers)."""
+    return {"pid": os.getpid(), **process_memory()}
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus metrics of this process: per-stage and per-route latency histograms, in-flight
+    requests, cache hit ratios, task queue depth and Gemini / job-site call outcomes.
+    """
+    # Rendering counts cache rows in SQLite, so it runs in the I/O pool.
+    return PlainTextResponse(await run_io(REGISTRY.render), media_type="text/plain; version=0.0.4")
+
+# --- Sampling Profiler (PROFILER_ENABLED=1) ---
+
+def require_profiler():
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiler endpoints are disabled (set PROFILER_ENABLED=1).")
+
+@app.post("/debug/profiler/start")
+async def start_profiler(interval_ms: float = 10):
+    """Starts sampling this process's threads every interval_ms (previous samples are discarded)."""
+    require_profiler()
+    if not 1 <= interval_ms <= 1000:
+        raise HTTPException(status_code=400, detail="interval_ms must be between 1 and 1000.")
+    if not profiler.start(interval_ms / 1000):
+        raise HTTPException(status_code=409, detail="Profiler is already running.")
+    return {"running": True, "pid": os.getpid(), "interval_ms": interval_ms}
+
+@app.post("/debug/profiler/stop")
+async def stop_profiler():
+    """Stops sampling and returns the report."""
+    require_profiler()
+    await run_io(profiler.stop)
+    return {"pid": os.getpid(), **profiler.report()}
+
+@app.get("/debug/profiler")
+async def profiler_report(format: str = "json", limit: int = 30):
+    """The samples so far: top frames and stacks, or format=collapsed for flamegraph.pl / speedscope."""
+    require_profiler()
+    if format == "collapsed":
+        return PlainTextResponse(profiler.collapsed())
+    return {"pid": os.getpid(), **profiler.report(limit)}
+
 # --- Main Execution Block ---
 # Allows running the server directly with `python main.py`
 if __name__ == "__main__":
@@ -0,0 +1,54 @@
+# memory_stats.py
+
+import os
+import sys
+from typing import Dict, Union
+
+# smaps_rollup field -> our key. Values are in kB.
+SMAPS_FIELDS = {
+    "Rss": "rss", "Pss": "pss",
+    "Shared_Clean": "shared", "Shared_Dirty": "shared",
+    "Private_Clean": "private", "Private_Dirty": "private",
+}
+
+
+def process_memory(pid: Union[int, str] = "self") -> Dict[str, float]:
+    """
+    Memory of one process in MB: rss, pss, shared and private.
+    pss splits each shared page among the processes mapping it, so summing pss over the
+    workers gives their real combined footprint (summing rss counts shared pages once per worker).
+    Read from /proc on Linux; elsewhere only the current process's peak RSS is reported.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            lines = f.readlines()
+    except OSError:
+        if pid not in ("self", os.getpid()):
+            return {}
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kB elsewhere.
+        return {"max_rss_mb": round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)}
+
+    totals = {"rss": 0, "pss": 0, "shared": 0, "private": 0}
+    for line in lines:
+        name, _, value = line.partition(":")
+        key = SMAPS_FIELDS.get(name)
+        if key:
+            totals[key] += int(value.split()[0])
+    return {f"{key}_mb": round(kb / 1024, 1) for key, kb in totals.items()}
+
+
+def memory_table(processes: Dict[str, int]) -> str:
+    """Formats process_memory for named pids as a text table with rss and pss totals."""
+    rows = [(name, pid, process_memory(pid)) for name, pid in processes.items()]
+    lines = [f"{'process':<12} {'pid':>7} {'rss MB':>9} {'pss MB':>9} {'shared MB':>10} {'private MB':>11}"]
+    for name, pid, memory in rows:
+        lines.append(f"{name:<12} {pid:>7} {memory.get('rss_mb', 0):>9.1f} {memory.get('pss_mb', 0):>9.1f} "
+                     f"{memory.get('shared_mb', 0):>10.1f} {memory.get('private_mb', 0):>11.1f}")
+    rss_total = sum(memory.get("rss_mb", 0) for _, _, memory in rows)
+    pss_total = sum(memory.get("pss_mb", 0) for _, _, memory in rows)
+    lines.append(f"{'total':<12} {'':>7} {rss_total:>9.1f} {pss_total:>9.1f}")
+    return "\n".join(lines)
+
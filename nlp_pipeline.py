@@ -0,0 +1,65 @@
+# nlp_pipeline.py
+
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
+if TYPE_CHECKING:
+    from spacy.language import Language
+
+logger = logging.getLogger(__name__)
+
+SPACY_MODEL = os.environ.get("SPACY_MODEL", "en_core_web_sm")
+
+# The app only reads doc.ents, so everything except NER is dropped at load time.
+UNUSED_COMPONENTS = ["tagger", "parser", "senter", "attribute_ruler", "lemmatizer"]
+
+# "auto" runs NER only where entities are used (the cover letter); "full" always runs it.
+NLP_MODE = os.environ.get("NLP_MODE", "auto").lower()
+
+
+def load_nlp(model_name: str = SPACY_MODEL, exclude: Iterable[str] = UNUSED_COMPONENTS) -> "Language":
+    """Loads a spaCy pipeline without the components the app never reads."""
+    import spacy  # imported here so that importing the app does not pay for spaCy up front
+
+    nlp = spacy.load(model_name, exclude=list(exclude))
+    # Drop a shared tok2vec if NER carries its own embedding layer and nothing listens to it.
+    if "tok2vec" in nlp.pipe_names and not getattr(nlp.get_pipe("tok2vec"), "listening_components", None):
+        nlp.remove_pipe("tok2vec")
+    logger.info(f"Loaded spaCy '{model_name}' with components: {nlp.pipe_names}")
+    return nlp
+
+
+def doc_entities(doc) -> Dict[str, List[str]]:
+    """Groups a doc's entity texts by label, de-duplicated and sorted."""
+    entities: Dict[str, set] = {}
+    for ent in doc.ents:
+        entities.setdefault(ent.label_, set()).add(ent.text.strip())
+    return {label: sorted(items) for label, items in entities.items()}
+
+
+def entities_needed(required: bool) -> bool:
+    """Returns whether NER should run for a caller, taking NLP_MODE into account."""
+    return required or NLP_MODE == "full"
+
+
+def profile_pipeline(nlp: "Language", texts: List[str]) -> Dict[str, float]:
+    """
+    Runs texts through the pipeline one component at a time.
+    Returns total milliseconds spent per component, including tokenization.
+    """
+    timings = {"tokenizer": 0.0}
+    for name in nlp.pipe_names:
+        timings[name] = 0.0
+
+    for text in texts:
+        start = time.perf_counter()
+        doc = nlp.make_doc(text)
+        timings["tokenizer"] += (time.perf_counter() - start) * 1000
+        for name, component in nlp.pipeline:
+            start = time.perf_counter()
+            doc = component(doc)
+            timings[name] += (time.perf_counter() - start) * 1000
+
+    return timings
@@ -0,0 +1,91 @@
+# profiler.py
+
+import collections
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler that can be started and stopped while the server runs.
+    A background thread records every thread's stack each interval; stacks are aggregated
+    in the collapsed format flamegraph.pl and speedscope read ("thread;outer;...;inner count").
+    Only this process is sampled: CPU pool workers and other server.py workers are not.
+    """
+
+    def __init__(self, max_depth: int = 64):
+        self.max_depth = max_depth
+        self.interval_seconds = 0.01
+        self._stacks: "collections.Counter[str]" = collections.Counter()
+        self._samples = 0
+        self._started_at: Optional[float] = None
+        self._stopped_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval_seconds: float = 0.01) -> bool:
+        """Clears previous samples and starts sampling. Returns False if already running."""
+        with self._lock:
+            if self.running:
+                return False
+            self.interval_seconds = interval_seconds
+            self._stacks.clear()
+            self._samples = 0
+            self._started_at, self._stopped_at = time.time(), None
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._stopped_at = self._stopped_at or time.time()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval_seconds):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, frame in frames.items():
+                    if thread_id == own_id:
+                        continue
+                    stack = []
+                    while frame is not None and len(stack) < self.max_depth:
+                        code = frame.f_code
+                        stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                        frame = frame.f_back
+                    stack.append(names.get(thread_id, str(thread_id)))
+                    self._stacks[";".join(reversed(stack))] += 1
+                self._samples += 1
+        self._stopped_at = time.time()
+
+    def collapsed(self) -> str:
+        """All stacks in collapsed format, one "stack count" line each."""
+        with self._lock:
+            return "\n".join(f"{stack} {count}" for stack, count in self._stacks.most_common())
+
+    def report(self, limit: int = 30) -> Dict:
+        """Sampling status plus the most frequent stacks and innermost frames."""
+        with self._lock:
+            top_frames: "collections.Counter[str]" = collections.Counter()
+            for stack, count in self._stacks.items():
+                top_frames[stack.rsplit(";", 1)[-1]] += count
+            end = self._stopped_at or time.time()
+            return {
+                "running": self.running,
+                "interval_ms": self.interval_seconds * 1000,
+                "samples": self._samples,
+                "duration_seconds": round(end - self._started_at, 2) if self._started_at else 0,
+                "top_frames": [{"frame": frame, "samples": count} for frame, count in top_frames.most_common(limit)],
+                "top_stacks": [{"stack": stack, "samples": count} for stack, count in self._stacks.most_common(limit)],
+            }
@@ -0,0 +1,191 @@
+# prompt_builder.py
+#
+# Selects the resume / job description content that goes into a Gemini prompt. Instead of the
+# first N characters, the text is split into section-tagged chunks (bullets, paragraphs), each
+# chunk is scored by the skills it mentions, and the best chunks are packed into a token budget
+# and emitted in their original order under their section headings.
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Set
+
+# Rough size of a Gemini token in characters of English text; only used to size the budget.
+CHARS_PER_TOKEN = 4
+# Chunks longer than this are split at line boundaries so one paragraph cannot take the whole budget;
+# a longer single line (a pasted job description) is split at sentence ends or, failing that, spaces.
+MAX_CHUNK_TOKENS = 120
+
+SENTENCE_END_RE = re.compile(r"[.!?;]\s+")
+BULLET_RE = re.compile(r"^\s*(?:[-*•●▪◦–·]|\d+[.)])\s+")
+# Section name -> weight; content under stronger sections wins ties with equally skilled content elsewhere.
+SECTION_WEIGHTS = {
+    "experience": 1.5, "work experience": 1.5, "professional experience": 1.5, "employment": 1.5,
+    "projects": 1.4, "responsibilities": 1.4, "requirements": 1.4, "qualifications": 1.3,
+    "summary": 1.2, "profile": 1.2, "about": 1.1, "skills": 1.0, "technical skills": 1.0,
+    "achievements": 1.1, "certifications": 0.9, "education": 0.8, "interests": 0.5, "hobbies": 0.5,
+}
+HEADER_WEIGHT = 0.6  # text before the first heading: name, contact details
+TARGET_SKILL_SCORE = 3.0
+OTHER_SKILL_SCORE = 1.0
+BASE_SCORE = 0.1  # chunks without skills still fill leftover budget, in document order (header last)
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class Chunk:
+    position: int
+    section: Optional[str]  # heading text as written, None before the first heading
+    text: str
+    score: float = 0.0
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text) + 1  # + the newline joining it to the next chunk
+
+
+def _heading_name(line: str, allow_unknown: bool = True) -> Optional[str]:
+    """Returns the normalized section name if the line looks like a section heading."""
+    stripped = line.strip().rstrip(":").strip()
+    if not stripped or len(stripped) > 40 or BULLET_RE.match(line):
+        return None
+    name = stripped.lower()
+    if name in SECTION_WEIGHTS:
+        return name
+    if not allow_unknown:
+        return None
+    # Unknown headings: short all-caps lines ("OPEN SOURCE") or short lines ending in a colon.
+    letters = [c for c in stripped if c.isalpha()]
+    if len(letters) >= 4 and len(stripped.split()) <= 4 and (stripped.isupper() or line.strip().endswith(":")):
+        return name
+    return None
+
+
+def cut_text(text: str, max_chars: int) -> str:
+    """The longest prefix of text up to max_chars that ends at a sentence end or, failing that, a space."""
+    if len(text) <= max_chars:
+        return text
+    window = text[:max_chars + 1]
+    sentence_ends = [match.end() for match in SENTENCE_END_RE.finditer(window)]
+    if sentence_ends and sentence_ends[-1] > max_chars // 2:
+        cut = sentence_ends[-1]
+    else:
+        cut = window.rfind(" ")
+        if cut <= 0:
+            cut = max_chars
+    return text[:cut].rstrip()
+
+
+def split_long_line(line: str, max_chars: int = MAX_CHUNK_TOKENS * CHARS_PER_TOKEN) -> List[str]:
+    """Splits a line into pieces of at most max_chars, at sentence ends or spaces where possible."""
+    pieces = []
+    while len(line) > max_chars:
+        piece = cut_text(line, max_chars)
+        pieces.append(piece)
+        line = line[len(piece):].lstrip()
+    if line:
+        pieces.append(line)
+    return pieces
+
+
+def split_chunks(text: str) -> List[Chunk]:
+    """
+    Splits text into chunks: each bullet, or each paragraph (lines up to a blank line, bullet
+    or heading), tagged with the heading it appears under. Heading lines are not chunks, and
+    a line over MAX_CHUNK_TOKENS becomes several chunks.
+    """
+    chunks: List[Chunk] = []
+    section: Optional[str] = None
+    current: List[str] = []
+
+    def flush():
+        if current:
+            chunks.append(Chunk(len(chunks), section, "\n".join(current)))
+            current.clear()
+
+    for line in text.splitlines():
+        if not line.strip():
+            flush()
+            continue
+        # The first line is usually the candidate's name, often in capitals; it is not a heading.
+        if _heading_name(line, allow_unknown=bool(chunks or current or section)) is not None:
+            flush()
+            section = line.strip()
+            continue
+        if BULLET_RE.match(line) or (current and estimate_tokens("\n".join(current)) >= MAX_CHUNK_TOKENS):
+            flush()
+        if estimate_tokens(line) > MAX_CHUNK_TOKENS:
+            flush()
+            for piece in split_long_line(line.rstrip()):
+                current.append(piece)
+                flush()
+            continue
+        current.append(line.rstrip())
+    flush()
+    return chunks
+
+
+def score_chunks(chunks: Iterable[Chunk], find_skills: Callable[[str], Set[str]], target_skills: Iterable[str]):
+    """Scores chunks in place: target skills count most, other known skills a little, times the section weight."""
+    targets = {skill.lower() for skill in target_skills}
+    for chunk in chunks:
+        skills = find_skills(chunk.text)
+        hits = len(skills & targets)
+        weight = SECTION_WEIGHTS.get(_heading_name(chunk.section) or "", 1.0) if chunk.section else HEADER_WEIGHT
+        chunk.score = (hits * TARGET_SKILL_SCORE + (len(skills) - hits) * OTHER_SKILL_SCORE) * weight
+        if chunk.section:
+            chunk.score += BASE_SCORE
+
+
+def pack_chunks(chunks: List[Chunk], budget_tokens: int) -> str:
+    """
+    Picks chunks by score (earlier first on ties) while they fit, then renders the picked
+    ones in document order with their section headings. Heading lines count against the budget.
+    If not even the best chunk fits, it is cut down to the budget rather than returning nothing.
+    """
+    selected, headings, used = set(), set(), 0
+    texts = {chunk.position: chunk.text for chunk in chunks}
+    for chunk in sorted(chunks, key=lambda c: (-c.score, c.position)):
+        cost = chunk.tokens
+        heading_cost = estimate_tokens(chunk.section) + 1 if chunk.section and chunk.section not in headings else 0
+        cost += heading_cost
+        if used + cost > budget_tokens:
+            if selected:
+                continue
+            room = max(0, budget_tokens - heading_cost - 1) * CHARS_PER_TOKEN
+            texts[chunk.position] = cut_text(chunk.text, room)
+            if not texts[chunk.position]:
+                continue
+            cost = estimate_tokens(texts[chunk.position]) + 1 + heading_cost
+        selected.add(chunk.position)
+        if chunk.section:
+            headings.add(chunk.section)
+        used += cost
+
+    lines, current_section = [], None
+    for chunk in chunks:
+        if chunk.position not in selected:
+            continue
+        if chunk.section and chunk.section != current_section:
+            lines.append(chunk.section)
+            current_section = chunk.section
+        lines.append(texts[chunk.position])
+    return "\n".join(lines)
+
+
+def select_relevant_text(text: str, find_skills: Callable[[str], Set[str]], target_skills: Iterable[str],
+                         budget_tokens: int, keep_lead: bool = False) -> str:
+    """
+    Returns text unchanged if it fits budget_tokens, otherwise its most relevant chunks that do.
+    With keep_lead the first chunk is always packed first (a job description's title and company).
+    """
+    if estimate_tokens(text) <= budget_tokens:
+        return text
+    chunks = split_chunks(text)
+    score_chunks(chunks, find_skills, target_skills)
+    if keep_lead and chunks:
+        chunks[0].score = math.inf
+    return pack_chunks(chunks, budget_tokens)
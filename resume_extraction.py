@@ -0,0 +1,132 @@
+# resume_extraction.py
+
+import asyncio
+import io
+import mmap
+import os
+from contextlib import contextmanager
+from typing import List, Tuple, Union
+
+from executor import run_cpu
+
+# --- Extraction Limits ---
+# Uploads above this size are rejected while they are being read.
+MAX_UPLOAD_BYTES = int(os.environ.get("RESUME_MAX_BYTES", 10 * 1024 * 1024))
+# Pages after this are ignored; a resume rarely needs more than a few.
+MAX_PAGES = int(os.environ.get("RESUME_MAX_PAGES", 50))
+# Extraction stops once this much text is collected (prompts only use the first 4000 characters).
+MAX_CHARS = int(os.environ.get("RESUME_MAX_CHARS", 50000))
+# Pages handled by one worker task; longer PDFs are split across the CPU pool.
+PAGES_PER_TASK = int(os.environ.get("RESUME_PAGES_PER_TASK", 8))
+
+# The file's bytes, or the path of a file holding them (uploads spilled to disk); a path is
+# what gets sent to CPU workers, instead of pickling the whole file for every task.
+DocumentSource = Union[bytes, str]
+
+
+def preload_parsers():
+    """Imports the PDF/DOCX parsers ahead of the first upload (before CPU workers fork, they inherit them)."""
+    import docx  # noqa: F401
+    import pdfplumber  # noqa: F401
+
+
+@contextmanager
+def open_pdf(source: DocumentSource):
+    """A binary stream over a PDF: the bytes, or a read-only memory map of the file."""
+    if isinstance(source, bytes):
+        yield io.BytesIO(source)
+        return
+    if os.path.getsize(source) == 0:  # an empty file cannot be mapped
+        yield io.BytesIO(b"")
+        return
+    with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield mapped
+
+
+def extract_pdf_pages(source: DocumentSource, start: int, end: int, max_chars: int = MAX_CHARS) -> Tuple[List[str], int]:
+    """
+    Extracts the text of pages [start, end) from a PDF, stopping early after max_chars.
+    Returns the page texts and the document's total page count. Runs inside a worker process.
+    """
+    pages = []
+    chars = 0
+    import pdfplumber
+
+    with open_pdf(source) as stream, pdfplumber.open(stream) as pdf:
+        total_pages = len(pdf.pages)
+        for page in pdf.pages[start:min(end, total_pages)]:
+            page_text = page.extract_text() or ""
+            pages.append(page_text)
+            chars += len(page_text) + 1
+            page.close()
+            if chars >= max_chars:
+                break
+    return pages, total_pages
+
+
+def extract_docx_text(source: DocumentSource, max_chars: int = MAX_CHARS) -> str:
+    """Extracts paragraph text from a DOCX, stopping early after max_chars."""
+    import docx
+
+    # A path is opened by zipfile, which only reads the parts it needs (mmap is not seekable() before 3.13).
+    doc = docx.Document(source if isinstance(source, str) else io.BytesIO(source))
+    paragraphs = []
+    chars = 0
+    for para in doc.paragraphs:
+        paragraphs.append(para.text)
+        chars += len(para.text) + 1
+        if chars >= max_chars:
+            break
+    return join_lines(paragraphs)[:max_chars]
+
+
+def join_lines(parts: List[str]) -> str:
+    """Joins page or paragraph texts, each followed by a newline (one allocation, no += loop)."""
+    return "".join(f"{part}\n" for part in parts)
+
+
+def extract_text_sync(source: DocumentSource, file_extension: str, max_pages: int = MAX_PAGES, max_chars: int = MAX_CHARS) -> str:
+    """Single-process extraction with the same limits, for scripts and batch jobs."""
+    if file_extension == "pdf":
+        pages, _ = extract_pdf_pages(source, 0, max_pages, max_chars)
+        return join_lines(pages)[:max_chars]
+    if file_extension == "docx":
+        return extract_docx_text(source, max_chars)
+    raise ValueError(f"Unsupported file type: {file_extension}")
+
+
+async def extract_pdf_text(source: DocumentSource, max_pages: int = MAX_PAGES, max_chars: int = MAX_CHARS) -> str:
+    """
+    Extracts PDF text in the CPU pool. The first chunk of pages also reports the page count;
+    remaining chunks run in parallel and are consumed in order until max_chars is reached.
+    """
+    pages, total_pages = await run_cpu(extract_pdf_pages, source, 0, min(PAGES_PER_TASK, max_pages), max_chars)
+    chars = sum(len(page) + 1 for page in pages)
+    last_page = min(total_pages, max_pages)
+
+    if chars < max_chars and last_page > PAGES_PER_TASK:
+        tasks = [
+            asyncio.ensure_future(run_cpu(extract_pdf_pages, source, start, min(start + PAGES_PER_TASK, last_page), max_chars))
+            for start in range(PAGES_PER_TASK, last_page, PAGES_PER_TASK)
+        ]
+        try:
+            for task in tasks:
+                chunk, _ = await task
+                pages.extend(chunk)
+                chars += sum(len(page) + 1 for page in chunk)
+                if chars >= max_chars:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return join_lines(pages)[:max_chars]
+
+
+async def extract_text(source: DocumentSource, file_extension: str) -> str:
+    """Extracts text from a PDF or DOCX without blocking the event loop."""
+    if file_extension == "pdf":
+        return await extract_pdf_text(source)
+    if file_extension == "docx":
+        return await run_cpu(extract_docx_text, source)
+    raise ValueError(f"Unsupported file type: {file_extension}")
@@ -0,0 +1,141 @@
+# resume_sessions.py
+
+import asyncio
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from analysis_cache import hash_text
+
+# Paragraphs longer than this many lines are split, so an edit re-analyzes a bounded amount of text
+# even when the resume has no blank lines.
+PARAGRAPH_MAX_LINES = 8
+
+# Analyzes {paragraph hash: text} and returns {paragraph hash: {"entities": ..., "skills": [...]}}.
+AnalyzeParagraphs = Callable[[Dict[str, str]], Awaitable[Dict[str, Dict]]]
+
+
+def split_paragraphs(text: str, max_lines: int = PARAGRAPH_MAX_LINES) -> List[str]:
+    """Splits text at blank lines, then into groups of at most max_lines lines. Lines are stripped."""
+    paragraphs, block = [], []
+
+    def flush():
+        for start in range(0, len(block), max_lines):
+            paragraphs.append("\n".join(block[start:start + max_lines]))
+        block.clear()
+
+    for line in text.splitlines():
+        line = line.strip()
+        if line:
+            block.append(line)
+        else:
+            flush()
+    flush()
+    return paragraphs
+
+
+class ResumeSession:
+    """
+    Analysis of a resume that is being edited. Per-paragraph results are kept by paragraph hash,
+    and skill/entity aggregates are reference counts over the paragraphs, so an update only
+    analyzes paragraphs that are new and adjusts the counts for those added or removed.
+    Entities are found per paragraph, which can differ slightly from running NER on the whole text.
+    """
+
+    def __init__(self, session_id: str, with_entities: bool):
+        self.session_id = session_id
+        self.with_entities = with_entities
+        self.version = 0
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
+        self._paragraph_hashes: List[str] = []
+        self._results: Dict[str, Dict] = {}
+        self._skill_counts: Counter = Counter()
+        self._entity_counts: Dict[str, Counter] = {}
+
+    def _apply(self, result: Dict, times: int):
+        """Adds (times > 0) or removes (times < 0) one paragraph's contribution to the aggregates."""
+        counters = [(self._skill_counts, result["skills"])]
+        for label, texts in (result["entities"] or {}).items():
+            counters.append((self._entity_counts.setdefault(label, Counter()), texts))
+        for counts, items in counters:
+            for item in items:
+                counts[item] += times
+                if counts[item] <= 0:
+                    del counts[item]
+
+    async def update(self, text: str, analyze: AnalyzeParagraphs) -> Dict:
+        """Replaces the session's text, analyzing only paragraphs it has not seen. Returns change counts."""
+        paragraphs = split_paragraphs(text)
+        hashes = [hash_text(paragraph) for paragraph in paragraphs]
+        previous, current = Counter(self._paragraph_hashes), Counter(hashes)
+        added, removed = current - previous, previous - current
+
+        missing = {h: paragraph for h, paragraph in zip(hashes, paragraphs) if h in added and h not in self._results}
+        if missing:
+            self._results.update(await analyze(missing))
+
+        for h, times in removed.items():
+            self._apply(self._results[h], -times)
+        for h, times in added.items():
+            self._apply(self._results[h], times)
+        self._results = {h: self._results[h] for h in current}
+        self._paragraph_hashes = hashes
+        self.version += 1
+        self.last_used = time.monotonic()
+        return {
+            "paragraphs": len(hashes),
+            "paragraphs_added": sum(added.values()),
+            "paragraphs_removed": sum(removed.values()),
+        }
+
+    def snapshot(self) -> Dict:
+        entities = None
+        if self.with_entities:
+            entities = {label: sorted(counts) for label, counts in sorted(self._entity_counts.items()) if counts}
+        return {
+            "session_id": self.session_id,
+            "version": self.version,
+            "skills": sorted(self._skill_counts),
+            "entities": entities,
+        }
+
+
+class ResumeSessionStore:
+    """In-memory sessions (per process), least recently used evicted beyond max_sessions or after ttl_seconds idle."""
+
+    def __init__(self, max_sessions: int = 1000, ttl_seconds: float = 3600):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, ResumeSession]" = OrderedDict()
+
+    def create(self, with_entities: bool) -> ResumeSession:
+        self._expire()
+        session = ResumeSession(uuid.uuid4().hex, with_entities)
+        self._sessions[session.session_id] = session
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return session
+
+    def get(self, session_id: str) -> Optional[ResumeSession]:
+        self._expire()
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.last_used = time.monotonic()
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_used >= cutoff:
+                break
+            del self._sessions[session_id]
+
+    def __len__(self) -> int:
+        return len(self._sessions)
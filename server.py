@@ -0,0 +1,180 @@
+# server.py
+#
+# Pre-fork production server. The master imports the app and loads the spaCy pipeline and
+# skill matcher once, then forks N uvicorn workers that accept on one shared socket. The
+# loaded models live in pages the workers share copy-on-write, so adding workers adds
+# cores without multiplying the model's memory.
+# Run: python server.py [--workers 4] [--host 0.0.0.0] [--port 8000]   (POSIX only)
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Dict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# Each worker already takes a core; a CPU process pool per worker would multiply processes and memory.
+os.environ.setdefault("CPU_WORKERS", "0")
+
+import uvicorn
+
+import main
+from memory_stats import memory_table
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("server")
+
+# --- Server Configuration ---
+WEB_WORKERS = int(os.environ.get("WEB_WORKERS", os.cpu_count() or 1))
+# Seconds between per-worker memory reports in the master's log (0 disables; SIGUSR1 logs one at any time).
+MEMORY_REPORT_INTERVAL = float(os.environ.get("MEMORY_REPORT_INTERVAL", 300))
+# Seconds workers get to finish in-flight requests on shutdown before they are killed.
+GRACEFUL_TIMEOUT = float(os.environ.get("GRACEFUL_TIMEOUT", 30))
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Binds the listening socket in the master so every worker accepts on the same one."""
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload():
+    """Loads everything the workers share, then freezes the heap so their GC does not write to those pages."""
+    start = time.perf_counter()
+    main.load_models()
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Preloaded models in {time.perf_counter() - start:.2f}s; {gc.get_freeze_count()} objects frozen.")
+
+
+def run_worker(sock: socket.socket, worker_id: int, log_level: str):
+    """Body of a forked worker: per-process resources, then uvicorn on the inherited socket."""
+    for signum in (signal.SIGINT, signal.SIGTERM, signal.SIGUSR1):
+        signal.signal(signum, signal.SIG_DFL)
+    # SQLite connections must not be shared across fork().
+    main.llm_cache.reopen()
+    if main.job_index:
+        main.job_index.reopen()
+    if hasattr(main.task_store, "reopen"):
+        main.task_store.reopen()
+    # The index file is shared, so one ingestion worker is enough.
+    if worker_id != 0:
+        main.run_job_ingestion = False
+
+    config = uvicorn.Config(main.app, log_level=log_level, timeout_graceful_shutdown=GRACEFUL_TIMEOUT)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class PreforkServer:
+    """Forks the workers, replaces any that exit, and stops them all on SIGTERM/SIGINT."""
+
+    def __init__(self, sock: socket.socket, workers: int, log_level: str = "info"):
+        self.sock = sock
+        self.worker_count = workers
+        self.log_level = log_level
+        self.workers: Dict[int, int] = {}  # pid -> worker id
+        self.stopping = False
+        self.report_requested = False
+
+    def spawn(self, worker_id: int):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.sock, worker_id, self.log_level)
+            except BaseException:
+                logger.exception(f"Worker {worker_id} crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = worker_id
+        logger.info(f"Started worker {worker_id} (pid {pid})")
+
+    def reap(self):
+        """Collects exited workers and, unless stopping, starts replacements."""
+        while self.workers:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            worker_id = self.workers.pop(pid, None)
+            if worker_id is None:
+                continue
+            if not self.stopping:
+                logger.warning(f"Worker {worker_id} (pid {pid}) exited with status {status}; restarting")
+                time.sleep(1)  # avoid a tight loop if workers fail on startup
+                self.spawn(worker_id)
+
+    def memory_report(self):
+        processes = {"master": os.getpid()}
+        processes.update({f"worker-{worker_id}": pid for pid, worker_id in sorted(self.workers.items(), key=lambda item: item[1])})
+        logger.info(f"Memory per process (pss shares pages among the processes using them):\n{memory_table(processes)}")
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGUSR1, self._handle_report)
+
+        for worker_id in range(self.worker_count):
+            self.spawn(worker_id)
+
+        # First report once the workers have warmed up.
+        next_report = time.monotonic() + min(MEMORY_REPORT_INTERVAL, 15) if MEMORY_REPORT_INTERVAL else None
+        while not self.stopping:
+            self.reap()
+            if self.report_requested or (next_report and time.monotonic() >= next_report):
+                self.report_requested = False
+                self.memory_report()
+                if next_report:
+                    next_report = time.monotonic() + MEMORY_REPORT_INTERVAL
+            time.sleep(0.5)
+        self.shutdown()
+
+    def shutdown(self):
+        logger.info(f"Stopping {len(self.workers)} workers")
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            logger.warning(f"Killing worker pid {pid} after the graceful timeout")
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.workers.clear()
+        self.sock.close()
+
+    def _handle_stop(self, signum, frame):
+        self.stopping = True
+
+    def _handle_report(self, signum, frame):
+        self.report_requested = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the API with several pre-forked workers.")
+    parser.add_argument("--workers", type=int, default=WEB_WORKERS)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)))
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    if not main.model:
+        print("Exiting: Gemini model could not be initialized. Please check your API key and configuration.")
+    else:
+        listener = bind_socket(args.host, args.port)
+        preload()
+        logger.info(f"Serving on {args.host}:{args.port} with {args.workers} workers (master pid {os.getpid()})")
+        PreforkServer(listener, args.workers, args.log_level).run()
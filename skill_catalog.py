@@ -0,0 +1,24 @@
+# skill_catalog.py
+#
+# The skills the app recognizes, shared by the API (main.py) and the bulk ingestion CLI (bulk_ingest.py).
+
+# A predefined list of skills for simple keyword matching.
+SKILLS_LIST = [
+    "python", "java", "c++", "c", "c#", "javascript", "typescript", "html", "css",
+    "react", "angular", "vue.js", "next.js", "fastapi", "node.js", "django", "flask",
+    "sql", "mysql", "postgresql", "mongodb", "redis",
+    "aws", "azure", "google cloud", "gcp", "docker", "kubernetes", "terraform",
+    "git", "github", "gitlab", "jira", "tailwind css",
+    "machine learning", "deep learning", "tensorflow", "pytorch", "scikit-learn",
+    "data analysis", "pandas", "numpy", "nlp", "computer vision",
+    "project management", "agile", "scrum", "product management"
+]
+
+# Common alternative spellings, mapped to their canonical entry in SKILLS_LIST.
+SKILL_ALIASES = {
+    "js": "javascript", "reactjs": "react", "react.js": "react", "vue": "vue.js", "vuejs": "vue.js",
+    "nextjs": "next.js", "nodejs": "node.js", "postgres": "postgresql", "mongo": "mongodb",
+    "k8s": "kubernetes", "amazon web services": "aws", "google cloud platform": "gcp",
+    "sklearn": "scikit-learn", "tailwind": "tailwind css", "natural language processing": "nlp",
+    "ml": "machine learning",
+}
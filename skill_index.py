@@ -0,0 +1,71 @@
+# skill_index.py
+
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from scipy import sparse
+
+
+class SkillIndex:
+    """Maps skills to matrix columns so many skill sets can be compared at once."""
+
+    def __init__(self, skills: Iterable[str]):
+        self.skills: List[str] = sorted(set(skills))
+        self.columns: Dict[str, int] = {skill: i for i, skill in enumerate(self.skills)}
+
+    def to_vector(self, skills: Iterable[str]) -> np.ndarray:
+        """Encodes one skill set as a boolean row vector."""
+        vector = np.zeros(len(self.skills), dtype=bool)
+        vector[[self.columns[s] for s in skills if s in self.columns]] = True
+        return vector
+
+    def to_matrix(self, skill_lists: List[Iterable[str]]) -> np.ndarray:
+        """Encodes many skill sets as a boolean matrix with one row per set."""
+        matrix = np.zeros((len(skill_lists), len(self.skills)), dtype=bool)
+        for row, skills in enumerate(skill_lists):
+            matrix[row, [self.columns[s] for s in skills if s in self.columns]] = True
+        return matrix
+
+    def to_sparse(self, skill_lists: List[Iterable[str]]) -> "sparse.csr_matrix":
+        """Encodes many skill sets as a sparse 0/1 float matrix, for large taxonomies or job sets."""
+        from scipy import sparse
+
+        rows, cols = [], []
+        for row, skills in enumerate(skill_lists):
+            columns = {self.columns[s] for s in skills if s in self.columns}
+            rows.extend([row] * len(columns))
+            cols.extend(columns)
+        data = np.ones(len(rows), dtype=np.float32)
+        return sparse.csr_matrix((data, (rows, cols)), shape=(len(skill_lists), len(self.skills)))
+
+    def decode(self, row: np.ndarray) -> List[str]:
+        """Returns the (sorted) skills set in a boolean row."""
+        return [self.skills[i] for i in np.flatnonzero(row)]
+
+
+def score_skill_matches(index: SkillIndex, resume_skills: Iterable[str], required_skill_lists: List[Iterable[str]]) -> List[Dict]:
+    """
+    Scores one resume against many skill requirements with matrix operations.
+    Returns, per requirement and in input order, the matching score and matched/missing skills.
+    """
+    required = index.to_matrix(required_skill_lists)
+    resume = index.to_vector(resume_skills)
+
+    matched = required & resume
+    missing = required & ~resume
+    required_counts = required.sum(axis=1)
+    matched_counts = matched.sum(axis=1)
+    scores = np.zeros(len(required_skill_lists), dtype=int)
+    has_requirements = required_counts > 0
+    scores[has_requirements] = np.round(matched_counts[has_requirements] / required_counts[has_requirements] * 100)
+
+    return [
+        {
+            "matching_score_percent": int(scores[i]),
+            "matched_skills": index.decode(matched[i]),
+            "missing_skills": index.decode(missing[i]),
+        }
+        for i in range(len(required_skill_lists))
+    ]
@@ -0,0 +1,96 @@
+# skill_matcher.py
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Characters that are part of a "word" for boundary checks. '+' and '#' are
+# included so that "c" does not match inside "c++" or "c#".
+WORD_CHARS = set("abcdefghijklmnopqrstuvwxyz0123456789+#_")
+DIGITS = set("0123456789")
+# A skill right after a '.' is a suffix ("js" in "node.js"), not a mention of its own.
+LEFT_BOUNDARY_BLOCKERS = WORD_CHARS | {"."}
+
+
+def version_suffix_end(text: str, index: int) -> int:
+    """Index just past a run of digits starting at index ("python3", "c++17", "html5")."""
+    while index < len(text) and text[index] in DIGITS:
+        index += 1
+    return index
+
+
+class SkillMatcher:
+    """
+    Finds skills in text with a single pass of an Aho-Corasick automaton.
+    The automaton is compiled once from a skill list plus an alias -> canonical mapping.
+    Matches must sit on word boundaries, so "java" does not match "javascript"; a trailing
+    version number is allowed ("python3", "html5/css3").
+    """
+
+    def __init__(self, skills: Iterable[str], aliases: Optional[Dict[str, str]] = None):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # For each state: the (pattern length, canonical skill, needs left boundary, needs right boundary) ending there.
+        self._outputs: List[List[Tuple[int, str, bool, bool]]] = [[]]
+        self.pattern_count = 0
+
+        patterns = {self._normalize(skill): skill for skill in skills}
+        for alias, canonical in (aliases or {}).items():
+            patterns[self._normalize(alias)] = canonical
+        for pattern, canonical in patterns.items():
+            if pattern:
+                self._add_pattern(pattern, canonical)
+        self._build_failure_links()
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Lowercases text and collapses whitespace (including line breaks) to single spaces."""
+        return " ".join(text.lower().split())
+
+    def _add_pattern(self, pattern: str, canonical: str):
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append((len(pattern), canonical, pattern[0] in WORD_CHARS, pattern[-1] in WORD_CHARS))
+        self.pattern_count += 1
+
+    def _build_failure_links(self):
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+    def find(self, text: str) -> Set[str]:
+        """Returns the set of canonical skills mentioned in the text."""
+        text = self._normalize(text)
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        last_index = len(text) - 1
+        found = set()
+        state = 0
+
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, canonical, left_boundary, right_boundary in outputs[state]:
+                start = i - length + 1
+                if left_boundary and start > 0 and text[start - 1] in LEFT_BOUNDARY_BLOCKERS:
+                    continue
+                if right_boundary and i < last_index:
+                    end = version_suffix_end(text, i + 1)
+                    if end <= last_index and text[end] in WORD_CHARS:
+                        continue
+                found.add(canonical)
+
+        return found
@@ -0,0 +1,356 @@
+# task_queue.py
+
+import asyncio
+import http.client
+import ipaddress
+import itertools
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.parse
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Collection, Dict, Optional, Tuple
+
+from executor import run_io
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+
+class QueueFullError(Exception):
+    """Raised by TaskQueue.submit when max_queued tasks are already waiting."""
+
+
+class WebhookURLError(ValueError):
+    """A webhook URL that is malformed or points at a host the server may not call."""
+
+
+# --- Stores ---
+# A store keeps task records (plain dicts) by id: create, update, get and purge.
+
+class InMemoryTaskStore:
+    """Task records in a dict. Per process, so with several server workers use SQLiteTaskStore."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._tasks: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def create(self, task: Dict):
+        self._tasks[task["task_id"]] = task
+        while len(self._tasks) > self.max_entries:
+            self._tasks.popitem(last=False)
+
+    def update(self, task_id: str, **fields):
+        task = self._tasks.get(task_id)
+        if task is not None:
+            task.update(fields)
+
+    def get(self, task_id: str) -> Optional[Dict]:
+        task = self._tasks.get(task_id)
+        return dict(task) if task is not None else None
+
+    def purge(self, finished_before: float) -> int:
+        expired = [task_id for task_id, task in self._tasks.items()
+                   if task["status"] in FINISHED and task["finished_at"] < finished_before]
+        for task_id in expired:
+            del self._tasks[task_id]
+        return len(expired)
+
+
+class SQLiteTaskStore:
+    """Task records in a SQLite table, shared by every process that opens the same file."""
+
+    blocking = True  # TaskQueue calls it through the I/O pool, off the event loop
+
+    COLUMNS = ("task_id", "kind", "status", "priority", "created_at", "started_at", "finished_at",
+               "result", "error", "webhook_url", "webhook_status")
+    JSON_COLUMNS = ("result", "error")
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect()
+
+    def _connect(self):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " task_id TEXT PRIMARY KEY, kind TEXT, status TEXT, priority INTEGER,"
+            " created_at REAL, started_at REAL, finished_at REAL,"
+            " result TEXT, error TEXT, webhook_url TEXT, webhook_status TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_tasks_finished ON tasks(finished_at)")
+
+    def reopen(self):
+        """Opens a fresh connection; call in a forked child (connections must not cross fork())."""
+        self._connect()
+
+    def _encode(self, column: str, value):
+        return json.dumps(value) if column in self.JSON_COLUMNS and value is not None else value
+
+    def create(self, task: Dict):
+        marks = ",".join("?" * len(self.COLUMNS))
+        with self._lock:
+            self._db.execute(f"INSERT INTO tasks ({','.join(self.COLUMNS)}) VALUES ({marks})",
+                             [self._encode(column, task.get(column)) for column in self.COLUMNS])
+
+    def update(self, task_id: str, **fields):
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE tasks SET {assignments} WHERE task_id = ?",
+                             [*(self._encode(column, value) for column, value in fields.items()), task_id])
+
+    def get(self, task_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute(f"SELECT {','.join(self.COLUMNS)} FROM tasks WHERE task_id = ?",
+                                   (task_id,)).fetchone()
+        if row is None:
+            return None
+        task = dict(zip(self.COLUMNS, row))
+        for column in self.JSON_COLUMNS:
+            if task[column] is not None:
+                task[column] = json.loads(task[column])
+        return task
+
+    def purge(self, finished_before: float) -> int:
+        with self._lock:
+            return self._db.execute("DELETE FROM tasks WHERE finished_at < ?", (finished_before,)).rowcount
+
+
+# --- Webhooks ---
+# webhook_url comes from the client, so it must not let the server reach internal hosts: the host
+# is resolved once, every address must be public (unless the host is on the allowlist), and the
+# POST goes to the checked address, so a second lookup cannot rebind it. Redirects are not followed.
+
+def resolve_webhook(url: str, allowed_hosts: Collection[str] = ()) -> Tuple[urllib.parse.SplitResult, str]:
+    """Validates a webhook URL and returns it parsed, with the address to connect to. Blocking (DNS)."""
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        raise WebhookURLError("webhook_url must be an http(s) URL.")
+    try:
+        port = parts.port or (443 if parts.scheme.lower() == "https" else 80)
+    except ValueError:
+        raise WebhookURLError("webhook_url has an invalid port.")
+    host = parts.hostname.lower()
+    if allowed_hosts and host not in allowed_hosts:
+        raise WebhookURLError(f"webhook_url host {host} is not in WEBHOOK_ALLOWED_HOSTS.")
+    try:
+        addresses = [info[4][0] for info in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)]
+    except (socket.gaierror, UnicodeError):
+        raise WebhookURLError(f"webhook_url host {host} cannot be resolved.")
+    if not allowed_hosts:
+        for address in addresses:
+            if not ipaddress.ip_address(address.split("%")[0]).is_global:
+                raise WebhookURLError(f"webhook_url host {host} resolves to a non-public address.")
+    return parts, addresses[0]
+
+
+class _PinnedHTTPConnection(http.client.HTTPConnection):
+    """Connects to an already resolved address while sending the URL's host name."""
+
+    def __init__(self, host: str, address: str, **kwargs):
+        super().__init__(host, **kwargs)
+        self.pinned_address = address
+
+    def connect(self):
+        self.sock = socket.create_connection((self.pinned_address, self.port), self.timeout)
+
+
+class _PinnedHTTPSConnection(http.client.HTTPSConnection):
+    """HTTPS to an already resolved address; the certificate is still checked against the host name."""
+
+    def __init__(self, host: str, address: str, **kwargs):
+        super().__init__(host, **kwargs)
+        self.pinned_address = address
+
+    def connect(self):
+        sock = socket.create_connection((self.pinned_address, self.port), self.timeout)
+        self.sock = self._context.wrap_socket(sock, server_hostname=self.host)
+
+
+def post_webhook(url: str, payload: Dict, timeout: float, allowed_hosts: Collection[str] = ()) -> int:
+    """POSTs the finished task as JSON. Returns the HTTP status; raises for non-2xx (redirects included)."""
+    parts, address = resolve_webhook(url, allowed_hosts)
+    connection_class = _PinnedHTTPSConnection if parts.scheme.lower() == "https" else _PinnedHTTPConnection
+    connection = connection_class(parts.hostname, address, port=parts.port, timeout=timeout)
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    try:
+        connection.request("POST", path, body=json.dumps(payload).encode("utf-8"),
+                           headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        if not 200 <= response.status < 300:
+            raise OSError(f"HTTP {response.status} {response.reason}")
+        return response.status
+    finally:
+        connection.close()
+
+
+# --- Queue ---
+
+
+class TaskQueue:
+    """
+    Runs submitted coroutines on a fixed number of asyncio workers, highest priority first
+    (FIFO within a priority). At most max_queued tasks wait; beyond that submit raises
+    QueueFullError so the API can shed load. Finished records stay in the store for
+    result_ttl_seconds, and a webhook (if given) receives the record once the task finishes.
+    Webhooks go to public addresses only, or only to webhook_allowed_hosts when that is set.
+    """
+
+    def __init__(self, store, workers: int = 4, max_queued: int = 100, result_ttl_seconds: float = 3600,
+                 webhook_timeout_seconds: float = 10, webhook_retries: int = 2,
+                 webhook_allowed_hosts: Collection[str] = ()):
+        self.store = store
+        self.webhook_allowed_hosts = {host.lower() for host in webhook_allowed_hosts}
+        self.worker_count = workers
+        self.max_queued = max_queued
+        self.result_ttl_seconds = result_ttl_seconds
+        self.webhook_timeout_seconds = webhook_timeout_seconds
+        self.webhook_retries = webhook_retries
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()
+        self._workers = []
+        self._background = set()
+        self._running = 0
+        self._last_purge = time.time()
+        self.stats = {"submitted": 0, "rejected": 0, "succeeded": 0, "failed": 0,
+                      "webhooks_sent": 0, "webhooks_failed": 0}
+
+    def start(self):
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        while len(self._workers) < self.worker_count:
+            self._workers.append(asyncio.ensure_future(self._work()))
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        # Queued work cannot outlive the process (it holds the upload in memory), so report it as failed.
+        while self._queue is not None and not self._queue.empty():
+            _, _, task_id, _ = self._queue.get_nowait()
+            await self._store("update", task_id, status=FAILED, finished_at=time.time(),
+                              error={"status_code": 503, "detail": "Server shut down before the task started."})
+
+    async def _store(self, method: str, *args, **kwargs):
+        """Calls a store method, in the I/O pool when the store blocks (SQLite)."""
+        func = getattr(self.store, method)
+        if getattr(self.store, "blocking", False):
+            return await run_io(func, *args, **kwargs)
+        return func(*args, **kwargs)
+
+    async def admit(self, webhook_url: Optional[str] = None):
+        """
+        Raises what submit() would for the queue's capacity or the webhook, so a caller can refuse
+        a task before preparing its input. submit() checks again.
+        """
+        if self._queue is None:
+            self.start()
+        if self._queue.qsize() >= self.max_queued:
+            self.stats["rejected"] += 1
+            raise QueueFullError(f"Task queue is full ({self.max_queued} waiting).")
+        if webhook_url:
+            await run_io(resolve_webhook, webhook_url, self.webhook_allowed_hosts)
+
+    async def submit(self, kind: str, run: Callable[[], Awaitable[Dict]], priority: int = 0,
+                     webhook_url: Optional[str] = None) -> Dict:
+        """
+        Queues run() and returns the new task record. Higher priority runs first.
+        Raises QueueFullError, or WebhookURLError for a webhook the server may not call.
+        """
+        await self.admit(webhook_url)
+        await self._purge_expired()
+
+        task = {
+            "task_id": uuid.uuid4().hex, "kind": kind, "status": QUEUED, "priority": priority,
+            "created_at": time.time(), "started_at": None, "finished_at": None,
+            "result": None, "error": None, "webhook_url": webhook_url, "webhook_status": None,
+        }
+        await self._store("create", task)
+        self._queue.put_nowait((-priority, next(self._sequence), task["task_id"], run))
+        self.stats["submitted"] += 1
+        return task
+
+    async def get(self, task_id: str) -> Optional[Dict]:
+        return await self._store("get", task_id)
+
+    async def _work(self):
+        while True:
+            _, _, task_id, run = await self._queue.get()
+            self._running += 1
+            try:
+                await self._execute(task_id, run)
+            finally:
+                self._running -= 1
+                self._queue.task_done()
+
+    async def _execute(self, task_id: str, run: Callable[[], Awaitable[Dict]]):
+        await self._store("update", task_id, status=RUNNING, started_at=time.time())
+        try:
+            result = await run()
+            await self._store("update", task_id, status=SUCCEEDED, result=result, finished_at=time.time())
+            self.stats["succeeded"] += 1
+        except asyncio.CancelledError:
+            await self._store("update", task_id, status=FAILED, finished_at=time.time(),
+                              error={"status_code": 503, "detail": "Server shut down before the task finished."})
+            raise
+        except Exception as e:
+            # HTTPException and LLMError both carry the status the synchronous endpoint would return.
+            detail = getattr(e, "detail", None) or str(e)
+            await self._store("update", task_id, status=FAILED, finished_at=time.time(),
+                              error={"status_code": getattr(e, "status_code", 500), "detail": detail})
+            self.stats["failed"] += 1
+
+        task = await self._store("get", task_id)
+        if task and task["webhook_url"]:
+            webhook = asyncio.ensure_future(self._deliver_webhook(task))
+            self._background.add(webhook)
+            webhook.add_done_callback(self._background.discard)
+
+    async def _deliver_webhook(self, task: Dict):
+        """Sends the finished record to the task's webhook, retrying failures with a short backoff."""
+        for attempt in range(self.webhook_retries + 1):
+            try:
+                status = await run_io(post_webhook, task["webhook_url"], task, self.webhook_timeout_seconds,
+                                      self.webhook_allowed_hosts)
+                await self._store("update", task["task_id"], webhook_status=f"delivered ({status})")
+                self.stats["webhooks_sent"] += 1
+                return
+            except WebhookURLError as e:
+                error = str(e)  # the host now resolves somewhere it may not; retrying will not help
+                break
+            except Exception as e:
+                error = str(e)
+                if attempt < self.webhook_retries:
+                    await asyncio.sleep(2 ** attempt)
+        logger.warning(f"Webhook for task {task['task_id']} failed: {error}")
+        await self._store("update", task["task_id"], webhook_status=f"failed: {error}")
+        self.stats["webhooks_failed"] += 1
+
+    async def _purge_expired(self):
+        now = time.time()
+        if now - self._last_purge >= 60:
+            self._last_purge = now
+            await self._store("purge", now - self.result_ttl_seconds)
+
+    def snapshot(self) -> Dict:
+        """Returns queue depth, busy workers and task counters."""
+        return {
+            **self.stats,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": self._running,
+            "workers": self.worker_count,
+            "max_queued": self.max_queued,
+        }
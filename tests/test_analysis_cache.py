@@ -0,0 +1,20 @@
+import asyncio
+
+from analysis_cache import AnalysisCache
+
+
+def test_async_disk_tier_round_trip(tmp_path):
+    async def run():
+        await AnalysisCache(disk_dir=str(tmp_path)).set_async("resume:abc", {"text": "hello"})
+        fresh = AnalysisCache(disk_dir=str(tmp_path))
+        first = await fresh.get_async("resume:abc")
+        second = await fresh.get_async("resume:abc")
+        missing = await fresh.get_async("resume:def")
+        return fresh, first, second, missing
+
+    cache, first, second, missing = asyncio.run(run())
+    assert first == second == {"text": "hello"}
+    assert missing is None
+    assert {k: cache.stats[k] for k in ("memory_hits", "disk_hits", "misses")} == \
+        {"memory_hits": 1, "disk_hits": 1, "misses": 1}
+    assert [path.name for path in tmp_path.iterdir()] == ["v3-resume-abc.json"]
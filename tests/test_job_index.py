@@ -0,0 +1,37 @@
+import sqlite3
+
+from job_index import JobIndex, job_id_for
+
+
+def posting(job_key: str, title: str = "Python Developer") -> dict:
+    return {"title": title, "company": "Acme", "location": "Remote", "site": "indeed",
+            "link": f"https://in.indeed.com/viewjob?jk={job_key}&from=serp",
+            "description": "Python and SQL."}
+
+
+def skills(text: str):
+    return [skill for skill in ("python", "sql") if skill in text.lower()]
+
+
+def test_two_postings_from_one_site_get_two_rows():
+    index = JobIndex()
+    index.upsert([posting("abc"), posting("def")], skills)
+    assert index.count() == 2
+    links = {job["link"] for job in index.search(["python"])}
+    assert links == {posting("abc")["link"], posting("def")["link"]}
+    assert len(index.search([], query_terms=["developer"])) == 2
+
+
+def test_rows_keyed_by_the_old_url_form_are_dropped_on_open(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    index = JobIndex(db_path)
+    index.upsert([posting("abc")], skills)
+    with sqlite3.connect(db_path) as db:
+        for table, column in (("jobs", "id"), ("job_skills", "job_id"), ("jobs_fts", "job_id")):
+            db.execute(f"UPDATE {table} SET {column} = ?", ("https://in.indeed.com/viewjob",))
+
+    reopened = JobIndex(db_path)
+    assert reopened.count() == 0
+    reopened.upsert([posting("abc")], skills)
+    assert [job["link"] for job in reopened.search(["python"])] == [posting("abc")["link"]]
+    assert job_id_for(posting("abc")) == "https://in.indeed.com/viewjob?jk=abc"
@@ -0,0 +1,33 @@
+from job_scraper import FakeJobBackend, merge_listings, normalize_url
+
+
+def indeed_listing(job_key: str, query: str = "") -> dict:
+    return {"title": "Python Developer", "company": "Acme", "location": "remote", "site": "indeed",
+            "link": f"https://in.indeed.com/viewjob?jk={job_key}{query}"}
+
+
+def test_normalize_url_keeps_identifying_params_and_drops_tracking():
+    assert normalize_url("https://in.indeed.com/viewjob?jk=abc&from=serp&utm_source=x#top") == \
+        "https://in.indeed.com/viewjob?jk=abc"
+    assert normalize_url("https://www.glassdoor.co.in/job-listing/j?jl=42") == \
+        "https://www.glassdoor.co.in/job-listing/j?jl=42"
+    assert normalize_url("HTTPS://Jobs.Example.com/a/?b=2&a=1") == "https://jobs.example.com/a?a=1&b=2"
+
+
+def test_postings_differing_only_in_job_key_both_survive_merge():
+    merged = merge_listings([[indeed_listing("abc"), indeed_listing("def")]])
+    assert [job["link"] for job in merged] == ["https://in.indeed.com/viewjob?jk=abc",
+                                               "https://in.indeed.com/viewjob?jk=def"]
+
+
+def test_merge_still_drops_duplicates():
+    tracked = indeed_listing("abc", "&from=serp&utm_campaign=x")
+    elsewhere = {**indeed_listing("abc"), "site": "linkedin", "link": "https://www.linkedin.com/jobs/view/9"}
+    assert merge_listings([[indeed_listing("abc"), tracked], [elsewhere]]) == [indeed_listing("abc")]
+
+
+def test_fake_backend_ids_are_query_parameters():
+    jobs = FakeJobBackend(overlap=0)("indeed", "python", "remote", 5)
+    urls = {normalize_url(url) for url in jobs["job_url"]}
+    assert len(urls) == 5
+    assert all("?jk=" in url for url in urls)
@@ -0,0 +1,46 @@
+from prompt_builder import estimate_tokens, select_relevant_text, split_chunks, MAX_CHUNK_TOKENS
+
+SKILLS = {"python", "docker", "kubernetes", "sql", "aws"}
+
+
+def find_skills(text: str) -> set:
+    return {word.strip(".,;").lower() for word in text.split()} & SKILLS
+
+
+def one_line_job_description(chars: int) -> str:
+    sentences = ["Senior Backend Engineer at Acme Corp.", "We build data pipelines for retail clients.",
+                 "You will design services in Python and deploy them with Docker on AWS.",
+                 "Experience with SQL and Kubernetes is a plus."]
+    text = ""
+    while len(text) < chars:
+        text += " ".join(sentences) + " "
+    return text[:chars]
+
+
+def test_single_line_job_description_over_budget_keeps_its_lead():
+    jd = one_line_job_description(2172)
+    assert "\n" not in jd
+    excerpt = select_relevant_text(jd, find_skills, {"python"}, 350, keep_lead=True)
+    assert excerpt.startswith("Senior Backend Engineer at Acme Corp.")
+    assert 0 < estimate_tokens(excerpt) <= 350
+
+
+def test_single_long_resume_line_under_a_heading_is_not_dropped():
+    resume = "Experience:\n" + one_line_job_description(4500)
+    excerpt = select_relevant_text(resume, find_skills, {"python", "docker"}, 700)
+    assert excerpt.startswith("Experience:\n")
+    assert "Python" in excerpt
+    assert estimate_tokens(excerpt) <= 700
+
+
+def test_long_lines_split_at_sentence_ends():
+    chunks = split_chunks(one_line_job_description(3000))
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk.text) <= MAX_CHUNK_TOKENS for chunk in chunks)
+    assert all(chunk.text.endswith(".") for chunk in chunks[:-1])
+
+
+def test_budget_smaller_than_any_chunk_still_returns_text():
+    text = "word " * 2000
+    excerpt = select_relevant_text(text, find_skills, set(), 20)
+    assert excerpt and estimate_tokens(excerpt) <= 20
@@ -0,0 +1,194 @@
+# uploads.py
+#
+# Starlette's multipart parser already spools each uploaded file: small ones stay in memory,
+# larger ones roll over to an anonymous temporary file. A SpooledUpload takes that file as it is
+# instead of copying it again: it hashes the content once (the SHA-256 is the analysis cache key)
+# and hands the parsers either the bytes or, for a rolled-over file, a /proc path to a duplicate
+# of its descriptor, which CPU workers memory-map instead of receiving a pickled copy per task.
+# The duplicate keeps the file alive after Starlette closes the upload, so queued tasks can use it.
+
+import hashlib
+import io
+import os
+import tempfile
+from typing import Optional, Tuple, Union
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.formparsers import MultiPartParser
+
+from executor import run_io
+from resume_extraction import MAX_UPLOAD_BYTES
+
+# --- Upload Limits ---
+# Uploads larger than this are written to a temporary file instead of being kept in memory.
+UPLOAD_SPOOL_BYTES = int(os.environ.get("UPLOAD_SPOOL_BYTES", 1024 * 1024))
+MultiPartParser.spool_max_size = UPLOAD_SPOOL_BYTES
+# Whole request bodies above this are rejected before they are parsed (the resume plus form
+# fields, e.g. the job descriptions of /analyze/batch).
+MAX_REQUEST_BYTES = int(os.environ.get("MAX_REQUEST_BYTES", MAX_UPLOAD_BYTES + 5 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Whether other processes can open a file through /proc/<pid>/fd/<fd> (Linux).
+HAS_PROC_FD = os.path.isdir("/proc/self/fd")
+
+
+def too_large_detail(max_bytes: int, what: str = "Resume file") -> str:
+    return f"{what} is too large (limit {max_bytes / (1024 * 1024):.1f} MB)."
+
+
+def _digest(src, dst=None) -> Tuple[str, int]:
+    """SHA-256 and size of src read from its start, copying it to dst on the way if given."""
+    digest = hashlib.sha256()
+    size = 0
+    src.seek(0)
+    while chunk := src.read(UPLOAD_CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+        if dst is not None:
+            dst.write(chunk)
+    if dst is not None:
+        dst.flush()
+    return digest.hexdigest(), size
+
+
+def _on_disk(spooled) -> bool:
+    """Whether an upload's file object is backed by a real file (Starlette's, once rolled over)."""
+    if hasattr(spooled, "_rolled"):
+        return spooled._rolled  # SpooledTemporaryFile.fileno() would force a rollover
+    try:
+        spooled.fileno()
+        return True
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return False
+
+
+class SpooledUpload:
+    """
+    A hashed resume upload: the bytes when small, otherwise a file descriptor (or, without /proc,
+    a named temporary copy) closed on close(). Use as a context manager, or close() it.
+    """
+
+    def __init__(self, extension: str, sha256: str, size: int, data: Optional[bytes] = None,
+                 fd: Optional[int] = None, copy=None):
+        self.extension = extension
+        self.sha256 = sha256  # same as analysis_cache.hash_bytes of the content
+        self.size = size
+        self._data = data
+        self._fd = fd
+        self._copy = copy
+        self._path = f"/proc/{os.getpid()}/fd/{fd}" if fd is not None else getattr(copy, "name", None)
+
+    @property
+    def spilled(self) -> bool:
+        return self._data is None
+
+    def source(self) -> Union[bytes, str]:
+        """What the parsers read: the bytes when in memory, otherwise a path to the file."""
+        return self._data if self._data is not None else self._path
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._copy is not None:
+            self._copy.close()
+            self._copy = None
+        self._data = None
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+async def spool_upload(file: UploadFile, extension: str, max_bytes: int = MAX_UPLOAD_BYTES) -> SpooledUpload:
+    """
+    Wraps an upload parsed by Starlette in a SpooledUpload, rejecting it with a 413 when it is over
+    max_bytes. The file has already been received by then; RequestSizeLimitMiddleware is what
+    stops an oversized request body while it is still arriving.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail=too_large_detail(max_bytes))
+    spooled = file.file
+    if not _on_disk(spooled):
+        await file.seek(0)
+        data = await file.read()
+        if len(data) > max_bytes:
+            raise HTTPException(status_code=413, detail=too_large_detail(max_bytes))
+        return SpooledUpload(extension, hashlib.sha256(data).hexdigest(), len(data), data=data)
+
+    if HAS_PROC_FD:
+        sha256, size = await run_io(_digest, spooled)
+        upload = SpooledUpload(extension, sha256, size, fd=os.dup(spooled.fileno()))
+    else:
+        copy = tempfile.NamedTemporaryFile(prefix="resume-", suffix=f".{extension}")
+        try:
+            sha256, size = await run_io(_digest, spooled, copy)
+        except BaseException:
+            copy.close()
+            raise
+        upload = SpooledUpload(extension, sha256, size, copy=copy)
+    if size > max_bytes:
+        upload.close()
+        raise HTTPException(status_code=413, detail=too_large_detail(max_bytes))
+    return upload
+
+
+class RequestSizeLimitMiddleware:
+    """
+    Rejects request bodies over max_bytes with a 413: by Content-Length before anything is read,
+    or, for chunked uploads, as soon as the bytes received pass the limit. In that case the app is
+    told the client disconnected (an exception raised from receive() would reach it wrapped by the
+    http middlewares' task groups) and its response is replaced by the 413.
+    """
+
+    def __init__(self, app, max_bytes: int = MAX_REQUEST_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def reject(self, scope, receive, send):
+        response = JSONResponse({"detail": too_large_detail(self.max_bytes, "Request")}, status_code=413)
+        await response(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self.reject(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            if exceeded:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    exceeded = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if exceeded and not response_started:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded:
+                raise
+        if exceeded and not response_started:
+            await self.reject(scope, receive, send)